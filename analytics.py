@@ -0,0 +1,138 @@
+# analytics.py
+import numpy as np
+
+from config import *
+
+# Load and fairness figures over a members x weeks assignment matrix. Every
+# statistic is a whole-array operation, so the cost stays flat in Python
+# terms whether the pool has fifty members or five thousand. The heatmap is
+# painted straight from the matrix into an RGB buffer the GUI wraps in a
+# QImage; no widget is created per cell.
+
+FREE, UNAVAIL = 0, 1   # cell codes; category k is drawn as code 2 + k
+
+class RosterMatrix:
+    __slots__ = ("names", "weeks", "roles", "cats", "cat_colors", "role_cat", "served", "cell", "member_idx", "week_idx", "role_idx")
+
+    def __init__(self, roster, members, week_columns, roles_order, category_config):
+        # MD is a tag on a band slot and cleanup goes to groups, not people,
+        # so neither counts towards a member's load (same as the dashboard)
+        self.names = list(members)
+        self.weeks = list(week_columns)
+        self.roles = [r for r in roles_order if r != "MD" and "Cleanup" not in r]
+        self.cats = list(category_config)
+        self.cat_colors = [data["color"] for data in category_config.values()]
+        cat_of = {r: k for k, data in enumerate(category_config.values()) for r in data["roles"]}
+        self.role_cat = np.array([cat_of.get(r, 0) for r in self.roles], dtype=np.int64)
+        row_of = {n: i for i, n in enumerate(self.names)}
+        col_of = {r: j for j, r in enumerate(self.roles)}
+
+        m_idx, w_idx, r_idx = [], [], []
+        for w, week in enumerate(self.weeks):
+            for role, val in roster.get(week, {}).items():
+                i, j = row_of.get(val.replace(" (MD)", "").strip()), col_of.get(role)
+                if i is None or j is None: continue
+                m_idx.append(i); w_idx.append(w); r_idx.append(j)
+        self.member_idx = np.array(m_idx, dtype=np.int32)
+        self.week_idx = np.array(w_idx, dtype=np.int32)
+        self.role_idx = np.array(r_idx, dtype=np.int32)
+
+        n, nw = len(self.names), len(self.weeks)
+        # Slots held per member per week; anything above 1 is a double booking
+        self.served = np.zeros((n, nw), dtype=np.uint8)
+        np.add.at(self.served, (self.member_idx, self.week_idx), 1)
+
+        self.cell = np.full((n, nw), FREE, dtype=np.uint8)
+        if n and nw:
+            self.cell[~_avail_matrix(members, self.names, nw)] = UNAVAIL
+        self.cell[self.member_idx, self.week_idx] = 2 + self.role_cat[self.role_idx]
+
+def _avail_matrix(members, names, n_weeks):
+    # MemberTable keeps availability as packed bit rows; unpack them in one go
+    if hasattr(members, "avail") and members.n_weeks == n_weeks and members.stride:
+        ids = np.array([members.ids[n] for n in names], dtype=np.int64)
+        packed = np.frombuffer(bytes(members.avail), dtype=np.uint8).reshape(-1, members.stride)[ids]
+        return np.unpackbits(packed, axis=1, bitorder="little")[:, :n_weeks].astype(bool)
+    return np.array([[c == "O" for c in members[n]["AvailString"][:n_weeks].ljust(n_weeks, "X")] for n in names], dtype=bool)
+
+def gini(values):
+    v = np.sort(np.asarray(values, dtype=np.float64))
+    n, total = len(v), v.sum()
+    if not n or not total: return 0.0
+    return float((2 * np.arange(1, n + 1) - n - 1) @ v / (n * total))
+
+def longest_runs(active):
+    # Longest stretch of consecutive True per row: pad with False, diff, and
+    # pair each run start with its end (np.nonzero walks rows in order)
+    n = active.shape[0]
+    edges = np.diff(np.pad(active.astype(np.int8), ((0, 0), (1, 1))), axis=1)
+    rs, starts = np.nonzero(edges == 1)
+    _, ends = np.nonzero(edges == -1)
+    best = np.zeros(n, dtype=np.int32)
+    np.maximum.at(best, rs, (ends - starts).astype(np.int32))
+    return best
+
+def compute_stats(mx, limit=LOAD_WARN):
+    active = mx.served > 0
+    load = mx.served.sum(axis=1, dtype=np.int32)
+    n = len(mx.names)
+
+    pairs = np.unique(mx.member_idx.astype(np.int64) * max(len(mx.roles), 1) + mx.role_idx)
+    diversity = np.bincount(pairs // max(len(mx.roles), 1), minlength=n) if n else np.zeros(0, dtype=np.int64)
+
+    per_cat = np.zeros((n, max(len(mx.cats), 1)), dtype=np.int32)
+    if len(mx.role_idx): np.add.at(per_cat, (mx.member_idx, mx.role_cat[mx.role_idx]), 1)
+
+    return {
+        "load": load,
+        "distribution": np.bincount(load) if n else np.zeros(1, dtype=np.int64),
+        "mean": float(load.mean()) if n else 0.0,
+        "variance": float(load.var()) if n else 0.0,
+        "gini": gini(load),
+        "over_limit": np.flatnonzero(load >= limit),
+        "idle": np.flatnonzero(load == 0),
+        "back_to_back": (active[:, 1:] & active[:, :-1]).sum(axis=1),
+        "longest_streak": longest_runs(active) if n else np.zeros(0, dtype=np.int32),
+        "double_booked": np.flatnonzero((mx.served > 1).any(axis=1)),
+        "per_category": per_cat,
+        "diversity": diversity,
+    }
+
+def format_summary(mx, stats, limit=LOAD_WARN, top=10):
+    names, load = mx.names, stats["load"]
+    lines = [
+        f"Members: {len(names)}   Weeks: {len(mx.weeks)}   Slots filled: {int(load.sum())}",
+        f"Load mean {stats['mean']:.2f}, variance {stats['variance']:.2f}, Gini {stats['gini']:.3f}",
+        "Distribution: " + ", ".join(f"{c}: {k}" for c, k in enumerate(stats["distribution"]) if k),
+        f"At or above {limit}: {len(stats['over_limit'])}   Not serving: {len(stats['idle'])}",
+    ]
+    if len(stats["double_booked"]):
+        lines.append("Double-booked: " + ", ".join(names[i] for i in stats["double_booked"]))
+
+    lines.append("")
+    lines.append("Busiest members:")
+    header = "  ".join(f"{c[:6]:>6}" for c in mx.cats)
+    lines.append(f"  {'Name':<20} Load  Run  B2B  Roles  {header}")
+    for i in np.argsort(-load, kind="stable")[:top]:
+        if not load[i]: break
+        cats = "  ".join(f"{v:>6}" for v in stats["per_category"][i][:len(mx.cats)])
+        lines.append(f"  {names[i][:20]:<20} {load[i]:>4}  {stats['longest_streak'][i]:>3}  {stats['back_to_back'][i]:>3}  {stats['diversity'][i]:>5}  {cats}")
+    return "\n".join(lines)
+
+def _rgb(hexcol):
+    h = hexcol.lstrip("#")
+    return [int(h[k:k + 2], 16) for k in (0, 2, 4)]
+
+def heatmap_rgb(mx, theme, order=None, cell_w=14, cell_h=4):
+    # Lookup table indexed by cell code, then expanded to pixel blocks
+    lut = np.array([_rgb(theme["bg_sec"]), _rgb(theme["bg_main"])] +
+                   [_rgb(theme["cats"].get(c, col)) for c, col in zip(mx.cats, mx.cat_colors)], dtype=np.uint8)
+    cells = mx.cell if order is None else mx.cell[order]
+    img = lut[cells]
+    # Double bookings stand out in white
+    served = mx.served if order is None else mx.served[order]
+    img[served > 1] = 255
+    img = np.repeat(np.repeat(img, cell_h, axis=0), cell_w, axis=1)
+    if cell_w > 2:
+        img[:, cell_w - 1::cell_w] = _rgb(theme["input_border"])
+    return np.ascontiguousarray(img)
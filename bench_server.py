@@ -0,0 +1,85 @@
+# bench_server.py
+import sys
+import json
+import time
+import asyncio
+import argparse
+from urllib.parse import quote
+
+# Throughput/latency benchmark for server.py. Opens --concurrency keep-alive
+# connections that each fire --requests calls at one endpoint, then prints
+# requests/second and latency percentiles.
+#
+#   uv run server.py --preload roster.xlsx
+#   uv run bench_server.py --path roster.xlsx --endpoint draft -c 16 -n 50
+
+async def _call(reader, writer, method, target, body):
+    raw = json.dumps(body).encode("utf-8") if body is not None else b""
+    writer.write((f"{method} {target} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+                  f"Content-Length: {len(raw)}\r\n\r\n").encode("latin-1") + raw)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        h = await reader.readline()
+        if h in (b"\r\n", b""): break
+        k, _, v = h.decode("latin-1").partition(":")
+        if k.strip().lower() == "content-length": length = int(v)
+    await reader.readexactly(length)
+    return status
+
+async def _worker(host, port, n, method, target, body, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for _ in range(n):
+            t = time.perf_counter()
+            status = await _call(reader, writer, method, target, body)
+            latencies.append(time.perf_counter() - t)
+            if status != 200: errors.append(status)
+    finally:
+        writer.close()
+
+def _pct(sorted_vals, p):
+    if not sorted_vals: return 0.0
+    return sorted_vals[min(len(sorted_vals) - 1, int(round(p / 100 * (len(sorted_vals) - 1))))]
+
+async def run(host, port, endpoint, path, concurrency, requests):
+    if endpoint == "roster":
+        method, target, body = "GET", f"/roster?path={quote(path)}", None
+    elif endpoint == "health":
+        method, target, body = "GET", "/health", None
+    else:
+        method, target, body = "POST", f"/{endpoint}", {"path": path}
+
+    # Warm up so parsing the workbook is not part of the measurement
+    reader, writer = await asyncio.open_connection(host, port)
+    if path: await _call(reader, writer, "POST", "/load", {"path": path})
+    writer.close()
+
+    latencies, errors = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*(_worker(host, port, requests, method, target, body, latencies, errors) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    lat = sorted(latencies)
+    total = len(lat)
+    print(f"{endpoint}: {total} requests over {concurrency} connections in {elapsed:.2f} s")
+    print(f"  throughput  {total / elapsed:8.1f} req/s")
+    print(f"  latency ms  p50 {_pct(lat, 50) * 1000:.1f}  p95 {_pct(lat, 95) * 1000:.1f}  "
+          f"p99 {_pct(lat, 99) * 1000:.1f}  max {lat[-1] * 1000 if lat else 0:.1f}")
+    if errors: print(f"  errors      {len(errors)} (statuses {sorted(set(errors))})")
+    return 1 if errors else 0
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark the local Auto-Roster service")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--endpoint", default="draft", choices=["health", "load", "draft", "roster", "validate"])
+    ap.add_argument("--path", default="", help="workbook path the server should use")
+    ap.add_argument("-c", "--concurrency", type=int, default=8)
+    ap.add_argument("-n", "--requests", type=int, default=50, help="requests per connection")
+    args = ap.parse_args(argv)
+    return asyncio.run(run(args.host, args.port, args.endpoint, args.path, args.concurrency, args.requests))
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,9 +12,30 @@ ROLES_ORDER =[
 # Roles that are eligible to be MD
 BAND_ROLES =["Piano", "Bass", "Guitar"]
 
+# ROSTER RULES
+# Checked by the draft, the validator, the resolver and the dropdowns alike.
+#   requires        {"role": R, "needs": N}            R stays empty unless N is filled
+#   excludes        {"role": R, "other": O}            O stays empty while R is filled
+#   must_be_in      {"role": R, "roles": [...],        R's holder also fills one of "roles"
+#                    "capability": C}                  that week and/or has capability C
+#   max_per_period  {"limit": N, "roles": [...]}       nobody fills those roles (default:
+#                                                      every slot) more than N times
+#   never_together  {"names": [A, B, ...]}             these people never serve the same week
+# An optional "name" is shown as the conflict kind.
+def default_rules(band_roles=BAND_ROLES):
+    return [
+        {"kind": "requires", "role": "Bass", "needs": "Piano", "name": "bass"},
+        {"kind": "must_be_in", "role": "MD", "roles": list(band_roles), "capability": "MD", "name": "md"},
+    ]
+
+RULES = default_rules()
+
 # Fixed Options for Cleanup
 CLEANUP_OPTIONS =["LHW", "UF", "LB", "YGSS", "SJS", "PK"]
 
+# Serving load (slots in the period) at which a member is flagged as overloaded
+LOAD_WARN = 3
+
 # Excel Code Mapping
 INSTRUMENT_MAP = {
     "WL": "Lead", "V": "Vocal", "P": "Piano", "G": "Guitar", 
@@ -49,10 +70,32 @@ CATEGORY_CONFIG = {
     }
 }
 
+# SERVICES
+# Each service keeps its own roster and role layout over the one member pool
+# loaded from Excel. Services on the same "day" never share a person in a week.
+SERVICES = {
+    "Main": {
+        "roles_order": ROLES_ORDER, "band_roles": BAND_ROLES,
+        "cleanup_options": CLEANUP_OPTIONS, "category_config": CATEGORY_CONFIG,
+        "rules": RULES, "day": "Sunday"
+    },
+    # "Evening": {
+    #     "roles_order": ["Lead", "Vocal 1", "Piano", "Sound", "Usher 1"],
+    #     "band_roles": ["Piano"], "cleanup_options": [], "rules": default_rules(["Piano"]),
+    #     "category_config": {
+    #         "Praise & Worship": {"roles": ["Lead", "Vocal 1", "Piano"], "color": "#c00000", "text_col": "white"},
+    #         "FPH": {"roles": ["Sound"], "color": "#0070c0", "text_col": "white"},
+    #         "Usher": {"roles": ["Usher 1"], "color": "#ffc000", "text_col": "black"}
+    #     },
+    #     "day": "Sunday"
+    # },
+}
+DEFAULT_SERVICE = next(iter(SERVICES))
+
 # Auto-generate Map
-def build_role_map(cat_colors):
+def build_role_map(cat_colors, category_config=CATEGORY_CONFIG):
     mapping = {}
-    for cat, data in CATEGORY_CONFIG.items():
+    for cat, data in category_config.items():
         color = cat_colors.get(cat, data["color"])
         for r in data["roles"]:
             mapping[r] = {"cat": cat, "color": color}
@@ -0,0 +1,231 @@
+# exporters.py
+import os
+import json
+import tempfile
+from collections import namedtuple
+
+import pandas as pd
+
+from config import *
+
+try:
+    from PIL import Image, ImageDraw, ImageFont
+    HAS_PIL = True
+except ImportError:
+    HAS_PIL = False
+
+# Renderers for the published artifacts. Each works from a RosterSnapshot, a
+# private copy of everything an export needs, so it can run in a worker while
+# the grid keeps being edited. Files are written to a temp file in the target
+# directory and renamed into place.
+
+RosterSnapshot = namedtuple("RosterSnapshot", [
+    "week_columns", "roles_order", "category_config", "cleanup_options",
+    "roster",    # {week: {role: display text, "(MD)" tag included}}
+    "members",   # MemberTable copy
+    "rows",      # RosterEngine.export_rows() output
+    "state",     # save-state JSON payload
+])
+
+def make_snapshot(engine, roster, state):
+    return RosterSnapshot(
+        tuple(engine.week_columns), tuple(engine.roles_order),
+        json.loads(json.dumps(engine.category_config)), tuple(engine.cleanup_options),
+        {w: dict(row) for w, row in roster.items()}, engine.all_members.copy(),
+        engine.export_rows(roster), json.loads(json.dumps(state)))
+
+def _atomic(path, write, binary=True):
+    d = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=d, prefix=".", suffix=".part")
+    try:
+        with os.fdopen(fd, "wb" if binary else "w", **({} if binary else {"encoding": "utf-8"})) as f:
+            write(f)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp): os.remove(tmp)
+        raise
+    return path
+
+def write_excel(snap, path):
+    return _atomic(path, lambda f: pd.DataFrame(snap.rows).to_excel(f, index=False, engine="openpyxl"))
+
+def write_state(snap, path):
+    return _atomic(path, lambda f: json.dump(snap.state, f, indent=2), binary=False)
+
+def render_image(snap, path):
+    # Gather Data
+    assigned_map = {w: {} for w in snap.week_columns}
+    counts = {n: 0 for n in snap.members}
+    cl_counts = {o: 0 for o in snap.cleanup_options}
+    act_roles = {n: set() for n in snap.members}
+    cl_act = {o: set() for o in snap.cleanup_options}
+    
+    r_data = {}
+    for w in snap.week_columns:
+        r_data[w] = {}
+        for role in snap.roles_order:
+            val = snap.roster[w].get(role, "")
+            r_data[w][role] = val
+            clean_val = val.replace(" (MD)", "")
+            if clean_val:
+                assigned_map[w][clean_val] = role
+                if "Cleanup" in role:
+                    cl_counts[clean_val] += 1; cl_act[clean_val].add(role)
+                else:
+                    if role != "MD":
+                        # Defensive check for name existing in data
+                        if clean_val in counts:
+                            counts[clean_val] += 1; act_roles[clean_val].add(role)
+
+    # Drawing
+    COL_W = 160; ROW_H = 30; MARGIN = 20; SP = 10
+    EC = THEMES["Light"]["cats"]
+    
+    EXPORT_ROLES =[r for r in snap.roles_order if r != "MD"]
+    
+    rw = COL_W * (len(EXPORT_ROLES)+1)
+    dw = 0
+    cat_widths = {}
+    for cat, data in snap.category_config.items():
+        # Count only non-MD roles for this category
+        valid_roles = [r for r in data["roles"] if r != "MD"]
+        w = len(valid_roles)*COL_W
+        if w > 0: # Only count if category has remaining roles
+            dw += w + SP
+            cat_widths[cat] = w
+    dw -= SP
+    iw = max(rw, dw) + (MARGIN*2)
+    
+    # Height calc
+    mx_rows = 0
+    for _, data in snap.category_config.items():
+        roles = data["roles"]
+        for r in roles:
+            c = len(snap.cleanup_options) if "Cleanup" in r else 0
+            if "Cleanup" not in r:
+                table = snap.members
+                c += sum(1 for _, i in table.iter_ids() if table.can(i, r))
+            mx_rows = max(mx_rows, c)
+    
+    ih = ROW_H*(len(snap.week_columns)+2) + 60 + ROW_H*(mx_rows+3) + MARGIN*2
+    
+    img = Image.new("RGB", (iw, ih), "white")
+    draw = ImageDraw.Draw(img)
+    try: font = ImageFont.truetype("arial.ttf", 12); fontb = ImageFont.truetype("arialbd.ttf", 12)
+    except: font = ImageFont.load_default(); fontb = font
+
+    # Draw Roster
+    y = MARGIN; x = (iw - rw)//2
+    cur_x = x + COL_W
+    for cat, data in snap.category_config.items():
+        w = cat_widths.get(cat, 0)
+        if w > 0:
+            draw.rectangle([cur_x, y, cur_x+w, y+ROW_H], fill="white", outline="black")
+            tl = draw.textlength(cat, fontb)
+            draw.text((cur_x+(w-tl)/2, y+5), cat, fill=EC.get(cat, "black"), font=fontb)
+            cur_x += w
+    y += ROW_H
+    
+    y += ROW_H
+    
+    draw.rectangle([x, y, x+COL_W, y+ROW_H], outline="black")
+    cur_x = x + COL_W
+    for r in EXPORT_ROLES:
+        draw.rectangle([cur_x, y, cur_x+COL_W, y+ROW_H], outline="black", fill="#f0f0f0")
+        draw.text((cur_x+5, y+5), r, fill="black", font=fontb)
+        cur_x += COL_W
+    y += ROW_H
+    
+    for w in snap.week_columns:
+        draw.rectangle([x, y, x+COL_W, y+ROW_H], outline="black")
+        draw.text((x+5, y+5), w, fill="black", font=font)
+        cur_x = x + COL_W
+        for r in EXPORT_ROLES:
+            v = r_data[w][r]
+            draw.rectangle([cur_x, y, cur_x+COL_W, y+ROW_H], outline="black")
+            if v: draw.text((cur_x+5, y+5), v, fill="black", font=font)
+            cur_x += COL_W
+        y += ROW_H
+
+    # Draw Dash
+    y += 60; x = (iw - dw)//2; cur_x = x
+    for cat, data in snap.category_config.items():
+        roles =[r for r in data["roles"] if r != "MD"] # Filter MD out
+        if not roles: continue
+        
+        w = len(roles)*COL_W
+        draw.rectangle([cur_x, y, cur_x+w, y+ROW_H], fill=EC.get(cat, "black"), outline="black")
+        draw.text((cur_x+5, y+5), cat, fill="white", font=fontb)
+        
+        rx = cur_x
+        for r in roles:
+            draw.rectangle([rx, y+ROW_H, rx+COL_W, y+ROW_H*2], fill="#eee", outline="black")
+            draw.text((rx+5, y+ROW_H+5), r, fill="black", font=fontb)
+            
+            mems =[]
+            if cat == "LG":
+                for o in snap.cleanup_options:
+                    act = r in cl_act.get(o, set())
+                    sv = 2
+                    if act: sv = 0 if cl_counts[o]>=LOAD_WARN else 1
+                    mems.append({"n": o, "av": "XXXX", "c": cl_counts[o], "act": act, "sv": sv})
+            else:
+                table = snap.members
+                for n, i in table.iter_ids():
+                    if table.can(i, r):
+                        act = r in act_roles.get(n, set())
+                        cnt = counts.get(n, 0)
+                        sv = 2
+                        if act: sv = 0 if cnt>=LOAD_WARN else 1
+                        mems.append({"n": n, "av": table.avail_string(i), "c": cnt, "act": act, "sv": sv})
+            
+            mems.sort(key=lambda x: (x["sv"], -x["c"], x["n"]))
+            
+            my = y + ROW_H*2
+            for m in mems:
+                bg = "white"
+                if m["act"]: bg = "#ffcccc" if m["c"]>=LOAD_WARN else "#ffeeb0"
+                
+                draw.rectangle([rx, my, rx+COL_W, my+ROW_H], fill=bg, outline="black")
+                draw.text((rx+5, my+5), m["n"], fill="black", font=font)
+                
+                ctxt = f"({m['c']})"
+                cln = draw.textlength(ctxt, font=font)
+                cx = rx + COL_W - cln - 5
+                draw.text((cx, my+5), ctxt, fill="black", font=font)
+                
+                if cat != "LG":
+                    sx = cx - 45
+                    for i, c in enumerate(m["av"]):
+                        col = "black"
+                        if c == "X": col = "#ccc"
+                        else:
+                            wk = snap.week_columns[i]
+                            if m["n"] in assigned_map[wk]:
+                                ar = assigned_map[wk][m["n"]]
+                                # Find color
+                                for ccat, data in snap.category_config.items():
+                                    if ar in data["roles"]: col = EC.get(ccat, "black"); break
+                        draw.text((sx + i*11, my+5), c, fill=col, font=fontb)
+                my += ROW_H
+            rx += COL_W
+        cur_x += w + SP
+    
+    return _atomic(path, lambda f: img.save(f, format="PNG"))
+
+ARTIFACTS = {
+    "xlsx": write_excel,
+    "png": render_image,
+    "json": write_state,
+}
+
+def export_all(snap, out_dir, executor, base="roster"):
+    # Submits one job per artifact to the caller's executor (it owns the pool;
+    # rendering is CPU-bound, so a process pool) and returns {kind: (path,
+    # future)}. PNG is skipped without Pillow.
+    jobs = {}
+    for kind, fn in ARTIFACTS.items():
+        if kind == "png" and not HAS_PIL: continue
+        path = os.path.join(out_dir, f"{base}_state.json" if kind == "json" else f"{base}.{kind}")
+        jobs[kind] = (path, executor.submit(fn, snap, path))
+    return jobs
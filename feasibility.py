@@ -0,0 +1,106 @@
+# feasibility.py
+from config import *
+from rules import RuleSet
+
+# Per-week bipartite matching of people onto roster slots. Tells apart blanks
+# the greedy draft caused from blanks no assignment could ever fill.
+
+def _slot_candidates(week_avail, roles_order):
+    # MD is never a slot of its own: it piggybacks on a band role
+    return {r: week_avail.get(r, []) for r in roles_order if r != "MD"}
+
+def _augment(slot, cands, match_slot, match_person, seen):
+    # Cheap pass first: any free candidate ends the search immediately
+    for p in cands[slot]:
+        if p not in match_person:
+            match_slot[slot] = p; match_person[p] = slot
+            return True
+    for p in cands[slot]:
+        if p in seen: continue
+        seen.add(p)
+        if _augment(match_person[p], cands, match_slot, match_person, seen):
+            match_slot[slot] = p; match_person[p] = slot
+            return True
+    return False
+
+def _hall_violator(start, cands, match_person, match_slot):
+    # Alternating BFS from an unmatched slot: every person reached is already
+    # matched, so the reached slots outnumber the people who can cover them
+    roles, people, queue = {start}, set(), [start]
+    while queue:
+        slot = queue.pop()
+        for p in cands[slot]:
+            if p in people: continue
+            people.add(p)
+            nxt = match_person.get(p)
+            if nxt and nxt not in roles:
+                roles.add(nxt); queue.append(nxt)
+    return roles, people
+
+def analyse_week(week_avail, roles_order=ROLES_ORDER, rules=None):
+    rules = rules if rules is not None else RuleSet(RULES, roles_order)
+    cands = _slot_candidates(week_avail, roles_order)
+    match_slot, match_person = {}, {}
+    # Slots another role needs go first: augmenting never unmatches a slot,
+    # and any slot that can be matched at all is in some maximum matching, so
+    # a need left unmatched really can't be placed. Scarcest slots first
+    # otherwise, which keeps the augmenting searches short.
+    needs = {need for _, need, _ in rules.requires}
+    for slot in sorted(cands, key=lambda r: (r not in needs, len(cands[r]))):
+        _augment(slot, cands, match_slot, match_person, set())
+
+    unmatched = [r for r in cands if r not in match_slot]
+    bottlenecks = []
+    for slot in unmatched:
+        roles, people = _hall_violator(slot, cands, match_person, match_slot)
+        if any(roles == b["roles"] for b in bottlenecks): continue
+        bottlenecks.append({"roles": roles, "people": people})
+
+    max_fill = len(match_slot)
+    # A role locked by a rule (Bass without Piano) does not count even if matched
+    locked = []
+    for role, need, _ in rules.requires:
+        if role in match_slot and need in cands and need not in match_slot:
+            locked.append((role, f"no {need} can be placed"))
+    for role, other, _ in rules.excludes:
+        if role in match_slot and other in match_slot:
+            locked.append((other, f"{role} is filled"))
+    for role, _ in locked:
+        if role in unmatched: continue
+        max_fill -= 1
+        unmatched.append(role)
+
+    return {"slots": len(cands), "max_fill": max_fill, "unfillable": unmatched,
+            "bottlenecks": bottlenecks, "locked": locked}
+
+def analyse_feasibility(engine, roster=None):
+    roster = roster if roster is not None else engine.initial_roster
+    report = {}
+    for week in engine.week_columns:
+        res = analyse_week(engine.availability_map.get(week, {}), engine.roles_order, engine.rules)
+        filled = sum(1 for r, v in roster.get(week, {}).items() if v and r != "MD")
+        res["draft_fill"] = filled
+        report[week] = res
+    return report
+
+def summarise(report):
+    unfillable = sum(r["slots"] - r["max_fill"] for r in report.values())
+    greedy_gap = sum(max(0, r["max_fill"] - r["draft_fill"]) for r in report.values())
+    return unfillable, greedy_gap
+
+def _order(names, order):
+    return sorted(names, key=lambda n: (order.index(n) if n in order else len(order), n))
+
+def format_report(report, roles_order=ROLES_ORDER):
+    lines = []
+    for week, r in report.items():
+        if r["max_fill"] == r["slots"] and r["draft_fill"] >= r["max_fill"]: continue
+        lines.append(f"{week}: {r['max_fill']}/{r['slots']} fillable, draft filled {r['draft_fill']}")
+        for b in r["bottlenecks"]:
+            roles = ", ".join(_order(b["roles"], roles_order))
+            people = ", ".join(sorted(b["people"])) or "nobody"
+            n_r, n_p = len(b["roles"]), len(b["people"])
+            lines.append(f"    {n_r} role{'s' if n_r != 1 else ''} ({roles}) only {'have' if n_r != 1 else 'has'} {n_p}: {people}")
+        for role, why in r["locked"]:
+            lines.append(f"    {role} is locked: {why}")
+    return "\n".join(lines)
@@ -2,21 +2,29 @@
 import os
 import json
 import functools
-import pandas as pd
+import datetime
+from bisect import bisect_left
+import multiprocessing
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from PySide6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
                                QPushButton, QLabel, QScrollArea, QFrame, 
-                               QFileDialog, QMessageBox, QComboBox, QGridLayout, QSplitter)
-from PySide6.QtCore import Qt, QTimer
-from PySide6.QtGui import QColor, QFont, QIcon
+                               QFileDialog, QMessageBox, QComboBox, QGridLayout, QSplitter,
+                               QProgressDialog, QInputDialog, QLineEdit, QDialog)
+from PySide6.QtCore import Qt, QTimer, QFileSystemWatcher
+from PySide6.QtGui import QColor, QFont, QFontMetrics, QIcon, QImage, QPainter, QPixmap
 
 from config import *
-from logic import RosterEngine
+from logic import ServicePool, STATE_VERSION, parse_state
+from feasibility import analyse_feasibility, summarise, format_report
+from resolver import suggest_fixes, format_changes
 
-try:
-    from PIL import Image, ImageDraw, ImageFont
-    HAS_PIL = True
-except ImportError:
-    HAS_PIL = False
+from exporters import HAS_PIL, make_snapshot, render_image, write_excel, export_all
+from personal import export_personal
+from search import MemberIndex, LOAD_BUCKETS
+from analytics import RosterMatrix, compute_stats, format_summary, heatmap_rgb
+
+WATCH_RETRIES = 10   # reload_timer ticks to wait for a renamed-away file to return
 
 class EnhancedComboBox(QComboBox):
     def __init__(self, callback, week, role, parent=None):
@@ -29,19 +37,170 @@ class EnhancedComboBox(QComboBox):
         self.callback(self.week, self.role, self)
         super().showPopup()
 
+class HeatmapView(QLabel):
+    # One pixmap for the whole members x weeks grid; hover maps back to a cell
+    def __init__(self, mx, roster, order, img, cell_w, cell_h, parent=None):
+        super().__init__(parent)
+        self.mx, self.roster, self.order, self.cell_w, self.cell_h = mx, roster, order, cell_w, cell_h
+        h, w, _ = img.shape
+        self.setPixmap(QPixmap.fromImage(QImage(img.data, w, h, img.strides[0], QImage.Format_RGB888).copy()))
+        self.setFixedSize(w, h)
+        self.setMouseTracking(True)
+
+    def mouseMoveEvent(self, e):
+        row, col = int(e.position().y()) // self.cell_h, int(e.position().x()) // self.cell_w
+        if row >= len(self.order) or col >= len(self.mx.weeks): return
+        name, week = self.mx.names[self.order[row]], self.mx.weeks[col]
+        held = [r for r, v in self.roster.get(week, {}).items() if v == name]
+        self.setToolTip(f"{name} - {week}: {', '.join(held) if held else 'not serving'}")
+
+class DashColumn(QWidget):
+    # One dashboard role column, painted from (name, bg, text colour, dots,
+    # count) rows. dots is ((text, colour), ...) per week, or None for a
+    # cleanup group. Like the heatmap, no widget is created per member:
+    # filtering swaps the row list and only rows in view are painted.
+    PAD = 3
+    _tail_cache = {}   # (dots, count, colour, font, height) -> QPixmap, shared by all columns
+
+    def __init__(self, role, cleanup, border, parent=None):
+        super().__init__(parent)
+        self.role, self.cleanup = role, cleanup
+        self.border = QColor(border)
+        self.keys, self.rows, self.shown, self.match = [], [], [], None
+        self.name_w, self.n_dots = 0, 2
+        self.ensurePolished()
+        self.bold = QFont(self.font()); self.bold.setBold(True)
+        self.small = QFont(self.font()); self.small.setPixelSize(10)
+        self.row_h = self.fontMetrics().height() + 2 * self.PAD
+        self.dot_w = QFontMetrics(self.bold).horizontalAdvance("O") + 2
+        self.count_w = QFontMetrics(self.small).horizontalAdvance("(00)")
+
+    def set_rows(self, keyed):
+        # keyed is [(sort key, row), ...] in order. Width covers every row, not
+        # just the shown ones, so filtering never reflows the grid sideways
+        fm = self.fontMetrics()
+        self.keys = [k for k, _ in keyed]
+        self.rows = [r for _, r in keyed]
+        self.name_w = max((fm.horizontalAdvance(r[0]) for r in self.rows), default=0)
+        self.n_dots = max((len(r[3]) for r in self.rows if r[3]), default=2)
+        self._refilter()
+
+    def patch(self, names, keyed):
+        # Replace only these names' rows, keeping the order; the column may
+        # grow wider but never narrower until the next set_rows
+        keep = [i for i, r in enumerate(self.rows) if r[0] not in names]
+        if len(keep) == len(self.rows) and not keyed: return
+        self.keys = [self.keys[i] for i in keep]
+        self.rows = [self.rows[i] for i in keep]
+        fm = self.fontMetrics()
+        for k, r in keyed:
+            i = bisect_left(self.keys, k)
+            self.keys.insert(i, k); self.rows.insert(i, r)
+            self.name_w = max(self.name_w, fm.horizontalAdvance(r[0]))
+            if r[3]: self.n_dots = max(self.n_dots, len(r[3]))
+        self._refilter()
+
+    def set_filter(self, match):
+        self.match = match
+        self._refilter()
+
+    def _refilter(self):
+        old, match = self.shown, self.match
+        self.shown = self.rows if match is None else [r for r in self.rows if r[0] in match]
+        self.setFixedWidth(self.name_w + self.n_dots * self.dot_w + self.count_w + 5 * self.PAD)
+        # Repaint only the band between the first and last rows that differ
+        n, h = min(len(old), len(self.shown)), self.row_h
+        first = next((k for k in range(n) if old[k] != self.shown[k]), n)
+        if len(old) != len(self.shown):
+            self.setFixedHeight(len(self.shown) * h)
+            last = max(len(old), len(self.shown))
+        else:
+            last = next((k + 1 for k in range(n - 1, first - 1, -1) if old[k] != self.shown[k]), first)
+        if last > first: self.update(0, first * h, self.width(), (last - first) * h)
+
+    def _tail(self, dots, count, fg):
+        # Week dots and load count as one cached pixmap: few distinct
+        # patterns recur across thousands of rows
+        key = (dots, count, fg, self.bold.key(), self.row_h)
+        pm = self._tail_cache.get(key)
+        if pm is None:
+            if len(self._tail_cache) > 4096: self._tail_cache.clear()
+            h, n = self.row_h - 1, len(dots) if dots else 0
+            dots_w = n * self.dot_w if dots else QFontMetrics(self.font()).horizontalAdvance("----")
+            pm = QPixmap(dots_w + self.PAD + self.count_w, h); pm.fill(Qt.transparent)
+            p = QPainter(pm)
+            if dots is None:
+                p.setFont(self.font()); p.setPen(self.palette().windowText().color())
+                p.drawText(0, 0, dots_w, h, Qt.AlignVCenter | Qt.AlignRight, "----")
+            else:
+                p.setFont(self.bold)
+                for i, (txt, col) in enumerate(dots):
+                    p.setPen(QColor(col))
+                    p.drawText(i * self.dot_w, 0, self.dot_w, h, Qt.AlignCenter, txt)
+            p.setFont(self.small); p.setPen(QColor(fg))
+            p.drawText(0, 0, pm.width(), h, Qt.AlignVCenter | Qt.AlignRight, count)
+            p.end()
+            self._tail_cache[key] = pm
+        return pm
+
+    def paintEvent(self, e):
+        if not self.shown: return
+        p = QPainter(self)
+        p.setFont(self.font())
+        w, h, pad = self.width(), self.row_h, self.PAD
+        base = pad + self.fontMetrics().ascent()
+        first = max(0, e.rect().top() // h)
+        last = min(len(self.shown), e.rect().bottom() // h + 1)
+        for k in range(first, last):
+            name, bg, fg, dots, count = self.shown[k]
+            y = k * h
+            p.fillRect(0, y, w, h - 1, self.border)
+            p.fillRect(1, y + 1, w - 2, h - 3, QColor(bg))
+            p.setPen(QColor(fg))
+            p.drawText(pad, y + base, name)
+            tail = self._tail(dots, count, fg)
+            p.drawPixmap(w - pad - tail.width(), y, tail)
+        p.end()
+
 class RosterApp(QMainWindow):
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Auto-Roster")
         self.setWindowIcon(QIcon("FirelightLogo.png"))
         self.resize(1600, 900)
-        self.engine = RosterEngine()
+        self.pool = ServicePool()
+        self.service = DEFAULT_SERVICE
+        self.engine = self.pool.engines[self.service]
+        self._service_stale = {}
+        self.export_pool = None
+        self.export_thread = None
+        self.export_jobs = {}
+        self.export_progress = None
+        self.export_timer = QTimer()
+        self.export_timer.setInterval(100)
+        self.export_timer.timeout.connect(self._poll_export)
         self.combos = {} 
         self.current_theme = "Dark" 
         self.update_timer = QTimer()
         self.update_timer.setSingleShot(True)
         self.update_timer.setInterval(80) 
         self.update_timer.timeout.connect(self._perform_dashboard_update)
+        self.loaded_path = None
+        self.stale_cells = set()
+        self.member_index = None
+        self.dash_cols = []
+        self.dash_shape = None
+        self.dash_occ = None
+        self.dash_dirty = set()
+        self.dash_filter = None
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.fileChanged.connect(lambda _: self.reload_timer.start())
+        # Editors often save in bursts (temp file, rename, touch); wait for quiet
+        self.reload_timer = QTimer()
+        self.reload_timer.setSingleShot(True)
+        self.reload_timer.setInterval(500)
+        self.reload_timer.timeout.connect(self.reload_watched_file)
+        self.watch_retries = 0
         if not HAS_PIL:
             QMessageBox.warning(self, "Missing Library", "Pillow not found. Image export disabled.")
         self.apply_theme(self.current_theme)
@@ -55,8 +214,7 @@ class RosterApp(QMainWindow):
         self.current_theme = theme_name
         t = THEMES[theme_name]
         
-        global ROLE_TO_CAT_MAP
-        ROLE_TO_CAT_MAP = build_role_map(t["cats"])
+        self.role_map = build_role_map(t["cats"], self.engine.category_config)
 
         css = f"""
             QWidget {{ background-color: {t['bg_main']}; color: {t['fg_pri']}; font-family: "Segoe UI", Arial; }}
@@ -95,6 +253,8 @@ class RosterApp(QMainWindow):
 
     def _build_ui(self):
         if self.centralWidget(): self.centralWidget().deleteLater()
+        query = self.search_box.text() if hasattr(self, 'search_box') else ""
+        self.dash_cols = []
         t = THEMES[self.current_theme]
         
         top = QFrame()
@@ -103,18 +263,27 @@ class RosterApp(QMainWindow):
         btn_load = QPushButton("Load Excel"); btn_load.clicked.connect(self.load_file)
         btn_save = QPushButton("Save State"); btn_save.clicked.connect(self.save_state)
         btn_load_s = QPushButton("Load State"); btn_load_s.clicked.connect(self.load_state)
+        self.btn_watch = QPushButton(f"Watch: {'On' if self.watcher.files() else 'Off'}"); self.btn_watch.clicked.connect(self.toggle_watch)
         
         self.lbl_status = QLabel("No file loaded"); self.lbl_status.setStyleSheet("color: red; margin-left: 10px;")
         
-        top_l.addWidget(btn_load); top_l.addWidget(btn_save); top_l.addWidget(btn_load_s)
+        top_l.addWidget(btn_load); top_l.addWidget(btn_save); top_l.addWidget(btn_load_s); top_l.addWidget(self.btn_watch)
+        if len(self.pool.engines) > 1:
+            cb_service = QComboBox(); cb_service.addItems(list(self.pool.engines)); cb_service.setCurrentText(self.service)
+            cb_service.currentTextChanged.connect(self.switch_service)
+            top_l.addWidget(QLabel("Service:")); top_l.addWidget(cb_service)
         top_l.addWidget(self.lbl_status); top_l.addStretch()
         
         btn_clear = QPushButton("Clear"); btn_clear.clicked.connect(self.clear_grid)
+        btn_resolve = QPushButton("Resolve"); btn_resolve.clicked.connect(self.resolve_conflicts)
+        btn_stats = QPushButton("Analytics"); btn_stats.clicked.connect(self.show_analytics)
         btn_ex_xl = QPushButton("Export Excel"); btn_ex_xl.clicked.connect(self.export_excel)
         btn_ex_img = QPushButton("Export Image"); btn_ex_img.clicked.connect(self.export_image_cmd)
+        btn_ex_all = QPushButton("Export All"); btn_ex_all.clicked.connect(self.export_all_cmd)
+        btn_ex_pers = QPushButton("Export Personal"); btn_ex_pers.clicked.connect(self.export_personal_cmd)
         btn_theme = QPushButton(f"Theme: {self.current_theme}"); btn_theme.clicked.connect(self.toggle_theme)
         
-        for b in[btn_clear, btn_ex_xl, btn_ex_img, btn_theme]: top_l.addWidget(b)
+        for b in[btn_clear, btn_resolve, btn_stats, btn_ex_xl, btn_ex_img, btn_ex_all, btn_ex_pers, btn_theme]: top_l.addWidget(b)
 
         central = QWidget(); self.setCentralWidget(central)
         main_l = QVBoxLayout(central); main_l.setContentsMargins(0,0,0,0); main_l.addWidget(top)
@@ -132,10 +301,15 @@ class RosterApp(QMainWindow):
         # Legend
         leg = QFrame(); leg_l = QHBoxLayout(leg)
         leg_l.addWidget(QLabel("LEGEND:"))
-        for c, d in CATEGORY_CONFIG.items():
+        for c, d in self.engine.category_config.items():
             l = QLabel(f" ■ {c} "); l.setStyleSheet(f"color: {d['color']}; font-weight: bold;")
             leg_l.addWidget(l)
         leg_l.addStretch()
+        self.search_box = QLineEdit(); self.search_box.setPlaceholderText(f"Filter: name  role:piano  load:{'|'.join(LOAD_BUCKETS)}  free:<week>")
+        self.search_box.setClearButtonEnabled(True); self.search_box.setMinimumWidth(340)
+        self.search_box.setText(query)
+        self.search_box.textChanged.connect(self.apply_dashboard_filter)
+        leg_l.addWidget(self.search_box)
         dash_l.addWidget(leg); dash_l.addWidget(scroll_d)
         splitter.addWidget(dash_frame)
         splitter.setSizes([400, 500])
@@ -144,16 +318,133 @@ class RosterApp(QMainWindow):
     def load_file(self):
         path, _ = QFileDialog.getOpenFileName(self, "Open Excel", "", "Excel Files (*.xlsx)")
         if not path: return
-        success, msg = self.engine.load_file(path)
+        success, msg = self.pool.load_file(path)
         if success:
-            self.lbl_status.setText(f"Loaded Excel: {os.path.basename(path)}")
+            self.stop_watch()
+            self.loaded_path = path
+            self.stale_cells = set()
+            self._service_stale = {}
+            self.member_index = None
+            self.lbl_status.setText(f"Loaded Excel: {os.path.basename(path)} {self._load_stats()}")
             self.lbl_status.setStyleSheet("color: #4CAF50; margin-left: 10px;")
-            self.engine.generate_draft()
+            self.pool.generate_drafts()
             self.render_roster_grid()
             self.trigger_dashboard_update()
+            self.run_feasibility_check()
         else:
             QMessageBox.critical(self, "Error", msg)
 
+    def _load_stats(self):
+        ld, c = self.pool.last_load, self.pool.cache
+        return f"[{'cache hit' if ld['cached'] else 'parsed'} in {ld['ms']:.0f} ms, {c.hits} hit{'s' if c.hits != 1 else ''} / {c.misses} miss{'es' if c.misses != 1 else ''}]"
+
+    def switch_service(self, name):
+        if name == self.service or name not in self.pool.engines: return
+        # Park this service's picks on its engine; nothing is re-parsed
+        if self.combos: self.engine.initial_roster = self._current_roster()
+        self._service_stale[self.service] = self.stale_cells
+        self.service = name
+        self.engine = self.pool.engines[name]
+        self.stale_cells = self._service_stale.pop(name, set())
+        self.combos = {}
+        self.member_index = None
+        self.apply_theme(self.current_theme)
+        if self.engine.week_columns and self.stale_cells:
+            held = {self.combos[c].currentText().replace(" (MD)", "").strip() for c in self.stale_cells if c in self.combos}
+            self.stale_cells = set()
+            self.flag_stale_assignments(held)
+            self.validate_all()
+
+    def toggle_watch(self):
+        if self.watcher.files() or self.watch_retries:
+            self.stop_watch()
+            return
+        if not self.loaded_path:
+            QMessageBox.warning(self, "Warning", "Load an Excel file first.")
+            return
+        self.watcher.addPath(self.loaded_path)
+        self.btn_watch.setText("Watch: On")
+
+    def stop_watch(self):
+        if self.watcher.files(): self.watcher.removePaths(self.watcher.files())
+        self.reload_timer.stop()
+        self.watch_retries = 0
+        self.btn_watch.setText("Watch: Off")
+
+    def reload_watched_file(self):
+        path = self.loaded_path
+        # Saving via rename drops the file from the watcher and it may not be
+        # back yet; keep checking for a few seconds, then stop watching
+        if not os.path.exists(path):
+            if self.watch_retries < WATCH_RETRIES:
+                self.watch_retries += 1
+                self.reload_timer.start()
+                return
+            self.stop_watch()
+            self.lbl_status.setText(f"Stopped watching: {os.path.basename(path)} no longer exists")
+            self.lbl_status.setStyleSheet("color: red; margin-left: 10px;")
+            return
+        self.watch_retries = 0
+        if path not in self.watcher.files(): self.watcher.addPath(path)
+
+        if self.combos: self.engine.initial_roster = self._current_roster()
+        success, msg, delta = self.pool.reload_file(path)
+        if not success:
+            self.lbl_status.setText(f"Reload failed: {msg}")
+            self.lbl_status.setStyleSheet("color: red; margin-left: 10px;")
+            return
+
+        name = os.path.basename(path)
+        if delta["reshaped"]:
+            # Keep whatever was picked for weeks that still exist, never redraft
+            for eng in self.pool.engines.values():
+                eng.initial_roster = {w: eng.initial_roster.get(w, {}) for w in eng.week_columns}
+            affected = set(self.engine.all_members) | {v for row in self.engine.initial_roster.values() for v in row.values()}
+            self.render_roster_grid()
+            self.stale_cells = set()
+        else:
+            affected = set(delta["added"] + delta["removed"] + delta["changed"])
+            if not affected:
+                self.lbl_status.setText(f"Loaded Excel: {name} (no changes) {self._load_stats()}")
+                return
+        self.flag_stale_assignments(affected)
+        # Other services pick the same names up when they are switched to
+        for svc, eng in self.pool.engines.items():
+            if svc == self.service: continue
+            held = {(w, r) for w, row in eng.initial_roster.items() for r, v in row.items() if v in affected}
+            if held: self._service_stale[svc] = self._service_stale.get(svc, set()) | held
+
+        summary = "weeks changed" if delta["reshaped"] else f"+{len(delta['added'])} / -{len(delta['removed'])} / ~{len(delta['changed'])} members"
+        stale = len(self.stale_cells)
+        self.lbl_status.setText(f"Loaded Excel: {name} (reloaded, {summary}" + (f", {stale} assignment{'s' if stale != 1 else ''} no longer valid)" if stale else ")") + f" {self._load_stats()}")
+        self.lbl_status.setStyleSheet(f"color: {'#FFA000' if stale else '#4CAF50'}; margin-left: 10px;")
+        self.validate_all()
+        # New weeks mean new columns; otherwise only the changed members' rows are redrawn
+        self.trigger_dashboard_update(affected)
+
+    def flag_stale_assignments(self, names):
+        # Re-check only cells held by people whose sign-up row changed
+        for (w, r), cb in self.combos.items():
+            val = cb.currentText().replace(" (MD)", "").strip()
+            if not val or val not in names: continue
+            if r == "MD": ok = self.engine.all_members.has_role(val, "MD")
+            else: ok = val in self.engine.availability_map[w].get(r, [])
+            if ok: self.stale_cells.discard((w, r))
+            else: self.stale_cells.add((w, r))
+
+    def run_feasibility_check(self):
+        report = analyse_feasibility(self.engine)
+        unfillable, greedy_gap = summarise(report)
+        if not unfillable and not greedy_gap:
+            self.lbl_status.setToolTip("Every slot can be filled.")
+            return
+        notes = []
+        if unfillable: notes.append(f"{unfillable} slot{'s' if unfillable != 1 else ''} unfillable")
+        if greedy_gap: notes.append(f"{greedy_gap} fillable blank{'s' if greedy_gap != 1 else ''} left by draft")
+        self.lbl_status.setText(f"{self.lbl_status.text()} ({', '.join(notes)})")
+        self.lbl_status.setStyleSheet("color: #FFA000; margin-left: 10px;")
+        self.lbl_status.setToolTip(format_report(report, self.engine.roles_order))
+
     def save_state(self):
         if not self.engine.week_columns:
             QMessageBox.warning(self, "Warning", "No active data to save.")
@@ -162,12 +453,7 @@ class RosterApp(QMainWindow):
         path, _ = QFileDialog.getSaveFileName(self, "Save State", "roster_state.json", "JSON Files (*.json)")
         if not path: return
         
-        data = {
-            "week_columns": self.engine.week_columns,
-            "all_members": self.engine.all_members,
-            "availability_map": self.engine.availability_map,
-            "selections": {f"{w}::{r}": self.combos[(w, r)].currentText() for w in self.engine.week_columns for r in ROLES_ORDER if (w, r) in self.combos}
-        }
+        data = self._state_data()
         
         try:
             with open(path, 'w', encoding='utf-8') as f:
@@ -176,32 +462,60 @@ class RosterApp(QMainWindow):
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to save state: {str(e)}")
 
+    def _state_data(self):
+        data = {
+            "version": STATE_VERSION,
+            "week_columns": self.engine.week_columns,
+            "all_members": self.engine.all_members.to_dict(),
+            "availability_map": self.engine.availability_map,
+            "selections": {f"{w}::{r}": self.combos[(w, r)].currentText() for w in self.engine.week_columns for r in self.engine.roles_order if (w, r) in self.combos},
+            "service": self.service
+        }
+        if len(self.pool.engines) > 1:
+            self.engine.initial_roster = self._current_roster()
+            data["services"] = {svc: {f"{w}::{r}": v for w, row in eng.initial_roster.items() for r, v in row.items()}
+                                for svc, eng in self.pool.engines.items()}
+        return data
+
+    def _snapshot(self):
+        # Grid text as shown (with the "(MD)" tag), frozen for the exporters
+        roster = {w: {r: self.combos[(w, r)].currentText() for r in self.engine.roles_order if (w, r) in self.combos}
+                  for w in self.engine.week_columns}
+        return make_snapshot(self.engine, roster, self._state_data())
+
     def load_state(self):
         path, _ = QFileDialog.getOpenFileName(self, "Load State", "", "JSON Files (*.json)")
         if not path: return
         try:
             with open(path, 'r', encoding='utf-8') as f:
                 data = json.load(f)
-            
-            self.engine.week_columns = data["week_columns"]
-            self.engine.all_members = data["all_members"]
-            self.engine.availability_map = data["availability_map"]
-            
-            self.engine.initial_roster = {w: {} for w in self.engine.week_columns}
-            selections = data.get("selections", {})
-            for k, v in selections.items():
-                if "::" in k:
-                    w, r = k.split("::", 1)
-                    if w not in self.engine.initial_roster:
-                        self.engine.initial_roster[w] = {}
-                    self.engine.initial_roster[w][r] = v
-                
-            self.lbl_status.setText(f"Loaded State: {os.path.basename(path)}")
-            self.lbl_status.setStyleSheet("color: #4CAF50; margin-left: 10px;")
-            self.render_roster_grid()
-            self.trigger_dashboard_update()
+            service, week_columns, members, rosters = parse_state(data, self.pool.engines)
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to load state: {str(e)}")
+            return
+
+        # Same service and weeks as on screen: the grid widgets can be reused
+        in_place = bool(self.combos) and service == self.service and list(week_columns) == self.engine.week_columns
+        if self.pool.restore(week_columns, members, rosters): self.member_index = None
+        self.service = service
+        self.engine = self.pool.engines[service]
+
+        self.stop_watch()
+        self.loaded_path = None
+        self.stale_cells = set()
+        self._service_stale = {}
+        self.lbl_status.setText(f"Loaded State: {os.path.basename(path)}")
+        self.lbl_status.setStyleSheet("color: #4CAF50; margin-left: 10px;")
+
+        # In place, only combos whose pick differs are refilled and restyled, and
+        # the dashboard redraws just the rows whose load or picks changed. Rule
+        # checks still read each week's row back from the combos.
+        if in_place:
+            self.refill_roster_grid()
+        else:
+            self.combos = {}
+            self.apply_theme(self.current_theme)
+        self.trigger_dashboard_update()
 
     def clear_grid(self):
         if not self.combos: return
@@ -209,6 +523,66 @@ class RosterApp(QMainWindow):
             for cb in self.combos.values(): cb.blockSignals(True); cb.setCurrentIndex(-1); cb.blockSignals(False)
             self.on_selection_change()
 
+    def _week_row(self, w):
+        return {r: self.combos[(w, r)].currentText().replace(" (MD)", "").strip()
+                for r in self.engine.roles_order if (w, r) in self.combos}
+
+    def _current_roster(self):
+        return {w: self._week_row(w) for w in self.engine.week_columns}
+
+    def resolve_conflicts(self):
+        if not self.combos: return
+        elsewhere = {w: self.pool.busy_elsewhere(self.service, w) for w in self.engine.week_columns}
+        changes = suggest_fixes(self._current_roster(), self.engine.availability_map,
+                                self.engine.all_members, self.engine.week_columns,
+                                roles_order=self.engine.roles_order, rules=self.engine.rules, elsewhere=elsewhere)
+        if not changes:
+            QMessageBox.information(self, "Resolve", "No conflicts to resolve.")
+            return
+
+        box = QMessageBox(self)
+        box.setWindowTitle("Resolve")
+        box.setText(f"Apply {len(changes)} suggested change{'s' if len(changes) != 1 else ''}?")
+        box.setDetailedText(format_changes(changes))
+        box.setStandardButtons(QMessageBox.Apply | QMessageBox.Cancel)
+        if box.exec() != QMessageBox.Apply: return
+
+        for w, r, _, new in changes:
+            self.stale_cells.discard((w, r))
+            cb = self.combos[(w, r)]
+            cb.blockSignals(True)
+            if new and cb.findText(new) == -1: cb.addItem(new)
+            if new: cb.setCurrentText(new)
+            else: cb.setCurrentIndex(-1)
+            cb.blockSignals(False)
+        for w in {c[0] for c in changes}: self.update_week_visuals(w)
+        self.on_selection_change()
+
+    def show_analytics(self):
+        if not self.combos: return
+        roster = self._current_roster()
+        mx = RosterMatrix(roster, self.engine.all_members, self.engine.week_columns,
+                          self.engine.roles_order, self.engine.category_config)
+        stats = compute_stats(mx)
+        t = THEMES[self.current_theme]
+        # Busiest first; rows shrink with the pool so the image stays a few thousand px tall
+        order = np.argsort(-stats["load"], kind="stable")
+        cell_w, cell_h = 14, max(1, min(12, 4000 // max(len(mx.names), 1)))
+        img = heatmap_rgb(mx, t, order, cell_w, cell_h)
+
+        dlg = QDialog(self); dlg.setWindowTitle("Analytics"); dlg.resize(900, 700)
+        lay = QVBoxLayout(dlg)
+        summary = QLabel(format_summary(mx, stats)); summary.setFont(QFont("Consolas", 9))
+        summary.setTextInteractionFlags(Qt.TextSelectableByMouse)
+        lay.addWidget(summary)
+        leg = QHBoxLayout()
+        for name, col in [("Free", t['bg_sec']), ("Unavailable", t['bg_main'])] + [(c, t['cats'].get(c, cc)) for c, cc in zip(mx.cats, mx.cat_colors)] + [("Double-booked", "#ffffff")]:
+            l = QLabel(f" ■ {name} "); l.setStyleSheet(f"color: {col}; font-weight: bold;"); leg.addWidget(l)
+        leg.addStretch(); lay.addLayout(leg)
+        scroll = QScrollArea(); scroll.setWidget(HeatmapView(mx, roster, order, img, cell_w, cell_h))
+        lay.addWidget(scroll)
+        dlg.exec()
+
     def render_roster_grid(self):
         while self.grid_l.count():
             item = self.grid_l.takeAt(0)
@@ -224,29 +598,22 @@ class RosterApp(QMainWindow):
         self.grid_l.addWidget(sep, 0, 1, rows, 1)
         
         col, prev_cat = 2, None
-        for role in ROLES_ORDER:
-            this_cat = ROLE_TO_CAT_MAP[role]["cat"]
+        for role in self.engine.roles_order:
+            this_cat = self.role_map[role]["cat"]
             if prev_cat and this_cat != prev_cat:
                 s = QFrame(); s.setFrameShape(QFrame.VLine); s.setStyleSheet(f"color: {t['input_border']}")
                 self.grid_l.addWidget(s, 0, col, rows, 1); col += 1
             
-            l = QLabel(role); l.setStyleSheet(f"font-weight: bold; color: {ROLE_TO_CAT_MAP[role]['color']}; padding: 2px;")
+            l = QLabel(role); l.setStyleSheet(f"font-weight: bold; color: {self.role_map[role]['color']}; padding: 2px;")
             l.setAlignment(Qt.AlignCenter); l.setFixedWidth(110)
             self.grid_l.addWidget(l, 0, col)
             
             for r, week in enumerate(self.engine.week_columns):
-                if role == ROLES_ORDER[0]: self.grid_l.addWidget(QLabel(week), r+1, 0)
+                if role == self.engine.roles_order[0]: self.grid_l.addWidget(QLabel(week), r+1, 0)
                 cb = EnhancedComboBox(self.update_dropdown_options, week, role)
                 cb.setEditable(False); cb.setFixedWidth(110)
                 
-                draft = self.engine.initial_roster[week].get(role, "")
-                display_val = ""
-                if draft:
-                    draft_clean = draft.replace(" (MD)", "").strip()
-                    display_val = draft_clean
-                    md_draft = self.engine.initial_roster[week].get("MD", "").replace(" (MD)", "").strip()
-                    if draft_clean == md_draft and md_draft:
-                        display_val += " (MD)"
+                display_val = self._draft_display(week, role)
                 
                 cb.addItem(""); 
                 if display_val: cb.addItem(display_val); cb.setCurrentText(display_val)
@@ -257,35 +624,54 @@ class RosterApp(QMainWindow):
         self.update_locks()
         self.trigger_dashboard_update()
 
+    def _draft_display(self, week, role):
+        draft = self.engine.initial_roster[week].get(role, "")
+        display_val = ""
+        if draft:
+            draft_clean = draft.replace(" (MD)", "").strip()
+            display_val = draft_clean
+            md_draft = self.engine.initial_roster[week].get("MD", "").replace(" (MD)", "").strip()
+            if draft_clean == md_draft and md_draft:
+                display_val += " (MD)"
+        return display_val
+
+    def refill_roster_grid(self):
+        # Put initial_roster into the existing combos without recreating them
+        for (week, role), cb in self.combos.items():
+            display_val = self._draft_display(week, role)
+            if cb.currentText() == display_val and cb.isEnabled(): continue
+            cb.blockSignals(True)
+            cb.clear(); cb.addItem("")
+            if display_val: cb.addItem(display_val); cb.setCurrentText(display_val)
+            cb.setEnabled(True)
+            cb.blockSignals(False)
+        self.update_locks()
+        self.validate_all()
+
     def update_dropdown_options(self, week, role, widget):
         curr_text = widget.currentText()
         curr_clean = curr_text.replace(" (MD)", "").strip()
         
-        if role == "MD":
-            # Show ANYONE assigned to a band role this week who has MD capability
-            potentials =[]
-            for br in BAND_ROLES:
-                if (week, br) in self.combos:
-                    val = self.combos[(week, br)].currentText()
-                    val_clean = val.replace(" (MD)", "").strip()
-                    if val_clean:
-                        roles = self.engine.all_members.get(val_clean, {}).get("Roles",[])
-                        if "MD" in roles: potentials.append(val_clean)
-            filtered = list(set(potentials))
-            filtered.sort()
+        rules = self.engine.rules
+        row = self._week_row(week)
+        if role in rules.tags:
+            # Show ANYONE the rule allows, e.g. MD-capable people in a band role this week
+            filtered = sorted(set(rules.options(role, row, self.engine.all_members)))
         else:
             capable = self.engine.availability_map[week].get(role, [])
-            busy =[]
-            for r in ROLES_ORDER:
+            busy = list(self.pool.busy_elsewhere(self.service, week))
+            for r in self.engine.roles_order:
                 if r == role: continue
                 if r == "MD": continue # MD is allowed to overlap
                 if (week, r) in self.combos:
                     val = self.combos[(week, r)].currentText()
                     val_clean = val.replace(" (MD)", "").strip()
                     if val_clean: busy.append(val_clean)
+            counts = rules.tally(self._current_roster(), self.engine.week_columns) if rules.caps else None
+            busy.extend(rules.blocked(role, [v for r, v in row.items() if v and r != role], counts))
             
             # Allow current user to stay selected (don't filter self out if re-opening box)
-            filtered =[p for p in capable if p not in busy or p == curr_clean]
+            filtered =[p for p in capable if (p not in busy and rules.admits(role, p, row, self.engine.all_members)) or p == curr_clean]
             if "Cleanup" not in role: filtered.sort()
         
         widget.blockSignals(True)
@@ -315,11 +701,15 @@ class RosterApp(QMainWindow):
 
     def on_selection_change(self, _=None):
         sender = self.sender()
+        weeks = None
         if isinstance(sender, EnhancedComboBox):
+            self.stale_cells.discard((sender.week, sender.role))
             self.update_week_visuals(sender.week)
+            # Rules look at one week, unless a period limit spans the roster
+            if not self.engine.rules.caps: weeks = [sender.week]
 
-        self.update_locks()
-        self.validate_all()
+        self.update_locks(weeks)
+        self.validate_all(weeks)
         self.trigger_dashboard_update()
 
     def update_week_visuals(self, week):
@@ -329,7 +719,7 @@ class RosterApp(QMainWindow):
             md_name = self.combos[(week, "MD")].currentText().replace(" (MD)", "").strip()
         
         # Update suffix for all roles in this week
-        for role in ROLES_ORDER:
+        for role in self.engine.roles_order:
             if (week, role) in self.combos:
                 cb = self.combos[(week, role)]
                 curr_txt = cb.currentText()
@@ -348,79 +738,122 @@ class RosterApp(QMainWindow):
                         cb.setItemText(idx, new_txt)
                     cb.blockSignals(False)
 
-    def update_locks(self):
-        for week in self.engine.week_columns:
-            if (week, "Piano") in self.combos:
-                p = self.combos[(week, "Piano")].currentText()
-                b = self.combos[(week, "Bass")]
-                if not p: b.setCurrentIndex(-1); b.setEnabled(False)
-                else: b.setEnabled(True)
+    def update_locks(self, weeks=None):
+        rules = self.engine.rules
+        for week in weeks or self.engine.week_columns:
+            locked = rules.locked(self._week_row(week))
+            for role in rules.lockable:
+                if (week, role) not in self.combos: continue
+                cb = self.combos[(week, role)]
+                if role in locked: cb.setCurrentIndex(-1); cb.setEnabled(False)
+                else: cb.setEnabled(True)
+
+    def validate_all(self, weeks=None):
+        rules = self.engine.rules
+        counts = rules.tally(self._current_roster(), self.engine.week_columns) if rules.caps else None
+        for week in weeks or self.engine.week_columns: self._validate_week(week, counts)
 
-    def validate_all(self):
+    def _validate_week(self, week, counts):
         bg = THEMES[self.current_theme]['input_bg']
-        for week in self.engine.week_columns:
-            seen, dupes = {},[]
-            for role in ROLES_ORDER:
-                if role == "MD": continue
-                val = self.combos[(week, role)].currentText().replace(" (MD)", "")
-                if val:
-                    if val in seen: dupes.append(val)
-                    seen[val] = True
+        elsewhere = self.pool.busy_elsewhere(self.service, week)
+        row = self._week_row(week)
+        seen, dupes = {},[]
+        for role in self.engine.roles_order:
+            if role == "MD": continue
+            val = row.get(role, "")
+            if val:
+                if val in seen: dupes.append(val)
+                seen[val] = True
+        # Rule breaks (MD not in band, Bass without Piano, ...) by cell
+        broken = {}
+        for label, _, roles in self.engine.rules.violations(row, self.engine.all_members, counts):
+            for r in roles: broken.setdefault(r, label)
+        
+        for role in self.engine.roles_order:
+            w = self.combos[(week, role)]
             
-            for role in ROLES_ORDER:
-                w = self.combos[(week, role)]
-                
-                # If disabled (e.g. Bass locked), don't override style
-                if not w.isEnabled():
-                    w.setStyleSheet("")
-                    continue
-
-                txt = w.currentText()
-                val = txt.replace(" (MD)", "")
-                style = f"color: {THEMES[self.current_theme]['fg_pri']}; background-color: {bg};"
-                
-                # Highlight MD if not in band
-                if role == "MD" and val:
-                    in_band = any(self.combos[(week, br)].currentText().replace(" (MD)", "") == val for br in BAND_ROLES if (week, br) in self.combos)
-                    if not in_band: style = f"color: red; background-color: {bg};"
-                # Highlight Dupes
-                elif val and val in dupes: style = f"color: red; background-color: {bg};"
-                # Highlight Bass without Piano
-                elif role == "Bass" and not self.combos[(week, "Piano")].currentText() and val:
-                    style = f"color: red; background-color: {bg};"
-                
-                w.setStyleSheet(style)
+            # If disabled (e.g. Bass locked), don't override style
+            if not w.isEnabled():
+                if w.styleSheet(): w.setStyleSheet("")
+                continue
+
+            val = row.get(role, "")
+            style = f"color: {THEMES[self.current_theme]['fg_pri']}; background-color: {bg};"
+            tip = ""
+            
+            # Highlight rule breaks
+            if val and role in broken:
+                style = f"color: red; background-color: {bg};"; tip = f"Breaks rule: {broken[role]}"
+            # Highlight Dupes
+            elif val and val in dupes: style = f"color: red; background-color: {bg};"
+            # Highlight people already serving another service that day
+            elif val and role != "MD" and val in elsewhere: style = f"color: red; background-color: {bg};"
+            # Highlight picks the reloaded sign-up sheet no longer allows
+            elif (week, role) in self.stale_cells and val:
+                style = f"color: #FFA000; background-color: {bg};"
+            
+            # Restyling re-polishes the combo; skip cells whose look didn't change
+            if w.styleSheet() != style: w.setStyleSheet(style)
+            w.setToolTip("No longer available in the reloaded sheet" if (week, role) in self.stale_cells else tip)
 
-    def trigger_dashboard_update(self): self.update_timer.start()
+    def trigger_dashboard_update(self, names=()):
+        # names: members whose sign-up rows changed (a watch reload); rows whose
+        # loads or picks changed are found by diffing the occupancy
+        self.dash_dirty |= set(names)
+        self.update_timer.start()
 
     def _perform_dashboard_update(self):
+        eng = self.engine
+        occ = eng.occupancy(self._current_roster())
+        names, self.dash_dirty = self.dash_dirty, set()
+        # Columns are rebuilt only when the grid, service, member table or weeks
+        # changed; otherwise the existing ones swap just the rows that differ
+        shape = (self.dash_l, eng, eng.all_members, tuple(eng.week_columns))
+        prev, self.dash_shape = self.dash_shape, shape
+        rebuild = not self.dash_cols or prev is None or any(a is not b for a, b in zip(shape[:3], prev)) or shape[3] != prev[3]
+        prev_occ, self.dash_occ = self.dash_occ, occ
+
+        # Loads change on every edit; names, roles and availability only on reload
+        if self.member_index is None or self.member_index.table is not eng.all_members:
+            self.member_index = MemberIndex(eng.all_members, eng.roles_order, eng.week_columns, eng.cleanup_options)
+        elif names: self.member_index.update(names)
+        self.member_index.set_loads({**occ[1], **occ[2]})
+        self.dash_filter = self.member_index.query(self.search_box.text())
+
+        if rebuild:
+            self._build_dashboard(occ)
+            return
+        names |= self._occupancy_changes(prev_occ, occ)
+        table, cleanup = eng.all_members, eng.cleanup_options
+        for dc in self.dash_cols:
+            dc.match = self.dash_filter
+            if dc.cleanup: keyed = [self._dash_row(o, None, dc.role, True, occ) for o in names if o in cleanup]
+            else:
+                ids = ((n, table.id_of(n)) for n in names)
+                keyed = [self._dash_row(n, i, dc.role, False, occ) for n, i in ids if i is not None and table.can(i, dc.role)]
+            if names: dc.patch(names, keyed)
+            else: dc.set_filter(self.dash_filter)
+
+    def _occupancy_changes(self, old, new):
+        # Names whose load, active roles or weekly picks differ; everyone else's
+        # dashboard rows are untouched
+        weeks = self.engine.week_columns
+        def state(occ, n):
+            assigned, counts, cl_counts, active, cl_active = occ
+            return (counts.get(n, 0), cl_counts.get(n, 0), active.get(n), cl_active.get(n),
+                    tuple(assigned.get(w, {}).get(n) for w in weeks))
+        touched = {n for held in old[0].values() for n in held} | {n for held in new[0].values() for n in held}
+        return {n for n in touched if state(old, n) != state(new, n)}
+
+    def _build_dashboard(self, occ):
         while self.dash_l.count(): 
             item = self.dash_l.takeAt(0)
             if item.widget(): item.widget().deleteLater()
-
-        assigned_map = {w: {} for w in self.engine.week_columns}
-        counts = {n: 0 for n in self.engine.all_members}
-        cl_counts = {o: 0 for o in CLEANUP_OPTIONS}
-        mem_active = {n: set() for n in self.engine.all_members}
-        cl_active = {o: set() for o in CLEANUP_OPTIONS}
-
-        for w in self.engine.week_columns:
-            for r in ROLES_ORDER:
-                if (w, r) in self.combos:
-                    val = self.combos[(w, r)].currentText().replace(" (MD)", "")
-                    if val:
-                        assigned_map[w][val] = r
-                        if "Cleanup" in r:
-                            if val in cl_counts: 
-                                cl_counts[val] += 1; cl_active[val].add(r)
-                        else:
-                            if r != "MD": # MD doesn't increment "Serving Load" count
-                                if val in counts: 
-                                    counts[val] += 1; mem_active[val].add(r)
+        self.dash_cols = []
 
         t = THEMES[self.current_theme]
         col = 0
-        for cat, data in CATEGORY_CONFIG.items():
+        for cat, data in self.engine.category_config.items():
             roles = data["roles"]
             l = QLabel(cat); l.setStyleSheet(f"background-color: {data['color']}; color: white; font-weight: bold;")
             l.setAlignment(Qt.AlignCenter)
@@ -432,94 +865,64 @@ class RosterApp(QMainWindow):
                 rl.setAlignment(Qt.AlignCenter)
                 self.dash_l.addWidget(rl, 1, cur_r_col)
                 
-                members =[]
-                if cat == "LG":
-                    for o in CLEANUP_OPTIONS:
-                        act = role in cl_active.get(o, set())
-                        sv = 2
-                        if act: sv = 0 if cl_counts[o]>=3 else 1
-                        members.append({"name": o, "av": "XXXX", "c": cl_counts[o], "act": act, "sv": sv})
-                else:
-                    for n, d in self.engine.all_members.items():
-                        # Capable?
-                        can = False
-                        if "Usher" in role: can = "Usher" in d["Roles"]
-                        elif "Vocal" in role: can = "Vocal" in d["Roles"]
-                        elif role in d["Roles"]: can = True
-                        
-                        if can:
-                            act = role in mem_active.get(n, set())
-                            cnt = counts.get(n, 0)
-                            sv = 2
-                            if act: sv = 0 if cnt>=3 else 1
-                            members.append({"name": n, "av": d["AvailString"], "c": cnt, "act": act, "sv": sv})
-                
-                members.sort(key=lambda x: (x["sv"], -x["c"], x["name"]))
-                
-                ridx = 2
-                for m in members:
-                    self.dash_l.addWidget(self._create_mem_cell(m, assigned_map), ridx, cur_r_col)
-                    ridx += 1
+                dc = DashColumn(role, cat == "LG", t['input_border'])
+                dc.match = self.dash_filter
+                dc.set_rows(self._dash_rows(dc, occ))
+                self.dash_l.addWidget(dc, 2, cur_r_col, Qt.AlignTop)
+                self.dash_cols.append(dc)
                 cur_r_col += 1
             
             sp = QFrame(); sp.setFixedWidth(15)
             self.dash_l.addWidget(sp, 0, cur_r_col)
             col = cur_r_col + 1
 
-    def _create_mem_cell(self, m, assigned_map):
+    def _dash_rows(self, dc, occ):
+        if dc.cleanup: rows = [self._dash_row(o, None, dc.role, True, occ) for o in self.engine.cleanup_options]
+        else:
+            table = self.engine.all_members
+            rows = [self._dash_row(n, i, dc.role, False, occ) for n, i in table.iter_ids() if table.can(i, dc.role)]
+        rows.sort(key=lambda kr: kr[0])
+        return rows
+
+    def _dash_row(self, name, i, role, cleanup, occ):
+        # (sort key, row) for one name in one dashboard column
+        assigned_map, counts, cl_counts, mem_active, cl_active = occ
+        c = (cl_counts if cleanup else counts).get(name, 0)
+        act = role in (cl_active if cleanup else mem_active).get(name, ())
+        sv = (0 if c >= LOAD_WARN else 1) if act else 2
         t = THEMES[self.current_theme]
-        f = QFrame()
         bg = t['bg_sec']
-        if m["act"]: bg = t['dash_bg_warn'] if m["c"]>=3 else t['dash_bg_notice']
-        
-        f.setStyleSheet(f"background-color: {bg}; border: 1px solid {t['input_border']};")
-        l = QHBoxLayout(f); l.setContentsMargins(2,2,2,2); l.setSpacing(2)
-        
-        tc = t['active_cell_text'] if m["act"] else t['fg_pri']
-        nm = QLabel(m["name"]); nm.setStyleSheet(f"border: none; color: {tc};"); l.addWidget(nm)
-        l.addStretch()
+        if act: bg = t['dash_bg_warn'] if c>=LOAD_WARN else t['dash_bg_notice']
+        tc = t['active_cell_text'] if act else t['fg_pri']
         
-        if m["name"] in CLEANUP_OPTIONS:
-            l.addWidget(QLabel("----"))
-        else:
-            for i, c in enumerate(m["av"]):
+        dots = None
+        if not cleanup and name not in self.engine.cleanup_options:
+            dots = []
+            for wk, a in zip(self.engine.week_columns, self.engine.all_members.avail_string(i)):
                 col = tc
                 txt = "O"
-                if c == "X": col = t['dash_text_unavail']; txt = "X"
-                else:
+                if a == "X": col = t['dash_text_unavail']; txt = "X"
+                elif name in assigned_map[wk]:
                     # Check assignment color
-                    wk = self.engine.week_columns[i]
-                    if m["name"] in assigned_map[wk]:
-                        rc = assigned_map[wk][m["name"]]
-                        col = ROLE_TO_CAT_MAP[rc]["color"]
-                dt = QLabel(txt); dt.setStyleSheet(f"color: {col}; font-weight: bold; border:none; background:transparent;"); l.addWidget(dt)
-        
-        ct = QLabel(f"({m['c']})"); ct.setStyleSheet(f"border:none; font-size:10px; color:{tc};"); l.addWidget(ct)
-        return f
+                    col = self.role_map[assigned_map[wk][name]]["color"]
+                dots.append((txt, col))
+            dots = tuple(dots)
+        return (sv, -c, name), (name, bg, tc, dots, f"({c})")
+
+    def apply_dashboard_filter(self, _=None):
+        # Answered from the index; each column just repaints the rows that change
+        if self.member_index is None or not hasattr(self, 'search_box'): return
+        match = self.member_index.query(self.search_box.text())
+        if match == self.dash_filter: return
+        self.dash_filter = match
+        for dc in self.dash_cols: dc.set_filter(match)
 
     def export_excel(self):
         if not self.engine.week_columns: return
         path, _ = QFileDialog.getSaveFileName(self, "Save Excel", "roster.xlsx", "Excel Files (*.xlsx)")
         if not path: return
         
-        data =[]
-        for w in self.engine.week_columns:
-            r = {"Week": w}
-            for role in ROLES_ORDER: 
-                if role == "MD": continue
-                r[role] = self.combos[(w, role)].currentText()
-            
-            # Band Mode
-            hd = r.get("Drum/Cajon", "") != ""; hk = r.get("Piano", "") != ""; hb = r.get("Bass", "") != ""
-            mode = "INCOMPLETE"
-            if hb: mode = "FULL BAND"
-            elif hd and hk: mode = "ACOUSTIC SET"
-            
-            fr = {"Week": w, "Band Mode": mode}
-            fr.update({k: v for k, v in r.items() if k != "Week"})
-            data.append(fr)
-        
-        pd.DataFrame(data).to_excel(path, index=False)
+        write_excel(self._snapshot(), path)
         QMessageBox.information(self, "Done", "Exported!")
 
     def export_image_cmd(self):
@@ -528,172 +931,69 @@ class RosterApp(QMainWindow):
         path, _ = QFileDialog.getSaveFileName(self, "Save Img", "roster.png", "PNG (*.png)")
         if not path: return
 
-        # Gather Data
-        assigned_map = {w: {} for w in self.engine.week_columns}
-        counts = {n: 0 for n in self.engine.all_members}
-        cl_counts = {o: 0 for o in CLEANUP_OPTIONS}
-        act_roles = {n: set() for n in self.engine.all_members}
-        cl_act = {o: set() for o in CLEANUP_OPTIONS}
-        
-        r_data = {}
-        for w in self.engine.week_columns:
-            r_data[w] = {}
-            for role in ROLES_ORDER:
-                val = self.combos[(w, role)].currentText()
-                r_data[w][role] = val
-                clean_val = val.replace(" (MD)", "")
-                if clean_val:
-                    assigned_map[w][clean_val] = role
-                    if "Cleanup" in role:
-                        cl_counts[clean_val] += 1; cl_act[clean_val].add(role)
-                    else:
-                        if role != "MD":
-                            # Defensive check for name existing in data
-                            if clean_val in counts:
-                                counts[clean_val] += 1; act_roles[clean_val].add(role)
-
-        # Drawing
-        COL_W = 160; ROW_H = 30; MARGIN = 20; SP = 10
-        EC = THEMES["Light"]["cats"]
-        
-        EXPORT_ROLES =[r for r in ROLES_ORDER if r != "MD"]
-        
-        rw = COL_W * (len(EXPORT_ROLES)+1)
-        dw = 0
-        cat_widths = {}
-        for cat, data in CATEGORY_CONFIG.items():
-            # Count only non-MD roles for this category
-            valid_roles = [r for r in data["roles"] if r != "MD"]
-            w = len(valid_roles)*COL_W
-            if w > 0: # Only count if category has remaining roles
-                dw += w + SP
-                cat_widths[cat] = w
-        dw -= SP
-        iw = max(rw, dw) + (MARGIN*2)
-        
-        # Height calc
-        mx_rows = 0
-        for _, data in CATEGORY_CONFIG.items():
-            roles = data["roles"]
-            for r in roles:
-                c = len(CLEANUP_OPTIONS) if "Cleanup" in r else 0
-                if "Cleanup" not in r:
-                    for n, d in self.engine.all_members.items():
-                        can = False
-                        if "Usher" in r: can = "Usher" in d["Roles"]
-                        elif "Vocal" in r: can = "Vocal" in d["Roles"]
-                        elif r in d["Roles"]: can = True
-                        if can: c += 1
-                mx_rows = max(mx_rows, c)
-        
-        ih = ROW_H*(len(self.engine.week_columns)+2) + 60 + ROW_H*(mx_rows+3) + MARGIN*2
-        
-        img = Image.new("RGB", (iw, ih), "white")
-        draw = ImageDraw.Draw(img)
-        try: font = ImageFont.truetype("arial.ttf", 12); fontb = ImageFont.truetype("arialbd.ttf", 12)
-        except: font = ImageFont.load_default(); fontb = font
-
-        # Draw Roster
-        y = MARGIN; x = (iw - rw)//2
-        cur_x = x + COL_W
-        for cat, data in CATEGORY_CONFIG.items():
-            w = cat_widths.get(cat, 0)
-            if w > 0:
-                draw.rectangle([cur_x, y, cur_x+w, y+ROW_H], fill="white", outline="black")
-                tl = draw.textlength(cat, fontb)
-                draw.text((cur_x+(w-tl)/2, y+5), cat, fill=EC.get(cat, "black"), font=fontb)
-                cur_x += w
-        y += ROW_H
-        
-        y += ROW_H
-        
-        draw.rectangle([x, y, x+COL_W, y+ROW_H], outline="black")
-        cur_x = x + COL_W
-        for r in EXPORT_ROLES:
-            draw.rectangle([cur_x, y, cur_x+COL_W, y+ROW_H], outline="black", fill="#f0f0f0")
-            draw.text((cur_x+5, y+5), r, fill="black", font=fontb)
-            cur_x += COL_W
-        y += ROW_H
-        
-        for w in self.engine.week_columns:
-            draw.rectangle([x, y, x+COL_W, y+ROW_H], outline="black")
-            draw.text((x+5, y+5), w, fill="black", font=font)
-            cur_x = x + COL_W
-            for r in EXPORT_ROLES:
-                v = r_data[w][r]
-                draw.rectangle([cur_x, y, cur_x+COL_W, y+ROW_H], outline="black")
-                if v: draw.text((cur_x+5, y+5), v, fill="black", font=font)
-                cur_x += COL_W
-            y += ROW_H
-
-        # Draw Dash
-        y += 60; x = (iw - dw)//2; cur_x = x
-        for cat, data in CATEGORY_CONFIG.items():
-            roles =[r for r in data["roles"] if r != "MD"] # Filter MD out
-            if not roles: continue
-            
-            w = len(roles)*COL_W
-            draw.rectangle([cur_x, y, cur_x+w, y+ROW_H], fill=EC.get(cat, "black"), outline="black")
-            draw.text((cur_x+5, y+5), cat, fill="white", font=fontb)
-            
-            rx = cur_x
-            for r in roles:
-                draw.rectangle([rx, y+ROW_H, rx+COL_W, y+ROW_H*2], fill="#eee", outline="black")
-                draw.text((rx+5, y+ROW_H+5), r, fill="black", font=fontb)
-                
-                mems =[]
-                if cat == "LG":
-                    for o in CLEANUP_OPTIONS:
-                        act = r in cl_act.get(o, set())
-                        sv = 2
-                        if act: sv = 0 if cl_counts[o]>=3 else 1
-                        mems.append({"n": o, "av": "XXXX", "c": cl_counts[o], "act": act, "sv": sv})
-                else:
-                    for n, d in self.engine.all_members.items():
-                        # Capable?
-                        can = False
-                        if "Usher" in r: can = "Usher" in d["Roles"]
-                        elif "Vocal" in r: can = "Vocal" in d["Roles"]
-                        elif r in d["Roles"]: can = True
-                        
-                        if can:
-                            act = r in act_roles.get(n, set())
-                            cnt = counts.get(n, 0)
-                            sv = 2
-                            if act: sv = 0 if cnt>=3 else 1
-                            mems.append({"n": n, "av": d["AvailString"], "c": cnt, "act": act, "sv": sv})
-                
-                mems.sort(key=lambda x: (x["sv"], -x["c"], x["n"]))
-                
-                my = y + ROW_H*2
-                for m in mems:
-                    bg = "white"
-                    if m["act"]: bg = "#ffcccc" if m["c"]>=3 else "#ffeeb0"
-                    
-                    draw.rectangle([rx, my, rx+COL_W, my+ROW_H], fill=bg, outline="black")
-                    draw.text((rx+5, my+5), m["n"], fill="black", font=font)
-                    
-                    ctxt = f"({m['c']})"
-                    cln = draw.textlength(ctxt, font=font)
-                    cx = rx + COL_W - cln - 5
-                    draw.text((cx, my+5), ctxt, fill="black", font=font)
-                    
-                    if cat != "LG":
-                        sx = cx - 45
-                        for i, c in enumerate(m["av"]):
-                            col = "black"
-                            if c == "X": col = "#ccc"
-                            else:
-                                wk = self.engine.week_columns[i]
-                                if m["n"] in assigned_map[wk]:
-                                    ar = assigned_map[wk][m["n"]]
-                                    # Find color
-                                    for ccat, data in CATEGORY_CONFIG.items():
-                                        if ar in data["roles"]: col = EC.get(ccat, "black"); break
-                            draw.text((sx + i*11, my+5), c, fill=col, font=fontb)
-                    my += ROW_H
-                rx += COL_W
-            cur_x += w + SP
-        
-        img.save(path)
-        QMessageBox.information(self, "Success", "Image Saved!")
\ No newline at end of file
+        render_image(self._snapshot(), path)
+        QMessageBox.information(self, "Success", "Image Saved!")
+
+    def export_all_cmd(self):
+        if not self.engine.week_columns: return
+        if self.export_jobs:
+            QMessageBox.information(self, "Export All", "An export is already running.")
+            return
+        out_dir = QFileDialog.getExistingDirectory(self, "Export All To")
+        if not out_dir: return
+
+        # Spawned, not forked: forking a process with Qt threads can deadlock the child
+        if self.export_pool is None: self.export_pool = ProcessPoolExecutor(max_workers=3, mp_context=multiprocessing.get_context("spawn"))
+        self.export_jobs = export_all(self._snapshot(), out_dir, executor=self.export_pool)
+
+        self.export_progress = QProgressDialog("Exporting...", None, 0, len(self.export_jobs), self)
+        self.export_progress.setWindowTitle("Export All")
+        self.export_progress.setWindowModality(Qt.NonModal)
+        self.export_progress.setMinimumDuration(0)
+        self.export_progress.setValue(0)
+        self.export_timer.start()
+
+    def export_personal_cmd(self):
+        if not self.engine.week_columns: return
+        if self.export_jobs:
+            QMessageBox.information(self, "Export Personal", "An export is already running.")
+            return
+        today = datetime.date.today()
+        next_sunday = today + datetime.timedelta(days=(6 - today.weekday()) % 7)
+        text, ok = QInputDialog.getText(self, "Export Personal", f"Date of {self.engine.week_columns[0]} (YYYY-MM-DD):", text=next_sunday.isoformat())
+        if not ok: return
+        try: first = datetime.date.fromisoformat(text.strip())
+        except ValueError:
+            QMessageBox.warning(self, "Warning", f"Not a date: {text}")
+            return
+        path, _ = QFileDialog.getSaveFileName(self, "Save Schedules", "personal_schedules.zip", "Zip Archives (*.zip)")
+        if not path: return
+
+        # The zip writer drives its own process pool, so run it off the GUI thread
+        if self.export_thread is None: self.export_thread = ThreadPoolExecutor(max_workers=1)
+        fut = self.export_thread.submit(export_personal, self._snapshot(), path, first)
+        self.export_jobs = {"schedules": (path, fut)}
+
+        self.export_progress = QProgressDialog("Exporting personal schedules...", None, 0, 1, self)
+        self.export_progress.setWindowTitle("Export Personal")
+        self.export_progress.setWindowModality(Qt.NonModal)
+        self.export_progress.setMinimumDuration(0)
+        self.export_progress.setValue(0)
+        self.export_timer.start()
+
+    def _poll_export(self):
+        # Futures finish in worker processes; only this timer touches the UI
+        done = [k for k, (_, fut) in self.export_jobs.items() if fut.done()]
+        self.export_progress.setValue(len(done))
+        self.export_progress.setLabelText(f"Exporting... {', '.join(done) or 'starting'}")
+        if len(done) < len(self.export_jobs): return
+
+        self.export_timer.stop()
+        self.export_progress.close()
+        jobs, self.export_jobs = self.export_jobs, {}
+        failed = [f"{k}: {fut.exception()}" for k, (_, fut) in jobs.items() if fut.exception()]
+        if failed:
+            QMessageBox.critical(self, "Error", "Export failed:\n" + "\n".join(failed))
+            return
+        self.lbl_status.setText(f"Exported: {', '.join(os.path.basename(p) for p, _ in jobs.values())}")
+        self.lbl_status.setStyleSheet("color: #4CAF50; margin-left: 10px;")
@@ -1,39 +1,169 @@
 # logic.py
+import io
+import os
+import time
 import pandas as pd
 import random
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from config import *
+from parse_cache import ParseCache, cache_key, config_digest, layout_signature
+from members import MemberTable
+from rules import RuleSet
+
+# Bump whenever _parse_members changes what it produces, so cached parses of
+# unchanged workbooks are not reused with stale semantics. Config the parse
+# reads (INSTRUMENT_MAP) is hashed into the keys, so it needs no bump.
+PARSER_VERSION = 3
+
+# Saved-state layout; files from before versioning count as version 1
+STATE_VERSION = 2
+
+# Below this size a multi-sheet workbook is read in-process: starting worker
+# processes (each importing pandas and reopening the file) costs more than
+# reading a few sign-up sheets one after another
+PARALLEL_READ_BYTES = 1 << 20
+
+_sheet_data = {}
+
+def _init_sheet_reader(data):
+    _sheet_data["data"] = data
+
+def _read_sheet(sheet, data=None):
+    # One sheet headed at its "Name" row, or None for sheets without one
+    # (notes, summaries). Runs in a worker process for multi-sheet workbooks.
+    data = _sheet_data["data"] if data is None else data
+    df_raw = pd.read_excel(io.BytesIO(data), sheet_name=sheet, header=None, keep_default_na=False)
+    header_row = -1
+    for i, row in enumerate(df_raw.itertuples(index=False)):
+        if "Name" in [str(x).strip() for x in row]:
+            header_row = i
+            break
+    
+    if header_row == -1: return None
+    
+    # Header taken from the rows already read rather than a second read;
+    # repeated headers are suffixed ".1", ".2" as pandas would
+    cols, seen = [], {}
+    for c in df_raw.iloc[header_row]:
+        c = str(c).replace('\n', ' ').strip()
+        if c in seen: seen[c] += 1; c = f"{c}.{seen[c]}"
+        else: seen[c] = 0
+        cols.append(c)
+    df = df_raw.iloc[header_row + 1:].reset_index(drop=True)
+    df.columns = cols
+    return df
 
 class RosterEngine:
-    def __init__(self):
-        self.df = None
+    def __init__(self, service=None, cache=None):
+        self.service = service or DEFAULT_SERVICE
+        cfg = SERVICES[self.service]
+        self.roles_order = cfg["roles_order"]
+        self.band_roles = cfg["band_roles"]
+        self.cleanup_options = cfg["cleanup_options"]
+        self.category_config = cfg["category_config"]
+        self.rules = RuleSet(cfg.get("rules") or default_rules(self.band_roles), self.roles_order)
+        self.day = cfg.get("day", self.service)
         self.week_columns =[]
         self.availability_map = {} 
         self.initial_roster = {}   
-        self.all_members = {} 
+        self.all_members = MemberTable() 
+        self._row_cache = {}
+        self.cache = cache or ParseCache()
+        self.last_load = {"cached": False, "ms": 0.0}
+
+    @property
+    def all_members(self): return self._members
+
+    @all_members.setter
+    def all_members(self, members):
+        # Plain {name: {"Roles", "AvailString"}} dicts (e.g. from saved state)
+        # are packed into a MemberTable on assignment
+        if not isinstance(members, MemberTable):
+            members = MemberTable(members, len(self.week_columns) if self.week_columns else None)
+        self._members = members
 
     def load_file(self, filepath):
         try:
-            df_raw = pd.read_excel(filepath, header=None, keep_default_na=False)
-            header_row = -1
-            for i, row in df_raw.iterrows():
-                row_str = [str(x).strip() for x in row.values]
-                if "Name" in row_str:
-                    header_row = i
-                    break
-            
-            if header_row == -1: return False, "Could not find 'Name' column."
-            
-            self.df = pd.read_excel(filepath, header=header_row, keep_default_na=False)
-            self.df.columns = self.df.columns.astype(str).str.replace('\n', ' ').str.strip()
-            
-            self._process_data()
+            parsed = self._parse_path(filepath)
+            if parsed is None: return False, "Could not find 'Name' column."
+            self.adopt(*parsed)
             return True, "File Loaded Successfully"
             
         except Exception as e:
             return False, str(e)
 
-    def _process_data(self):
-        cols = self.df.columns
+    def reload_file(self, filepath):
+        # Re-read a changed workbook and patch only the members that differ.
+        # Returns (success, msg, delta) where delta lists added/removed/changed
+        # names, or reshaped=True when the week columns themselves moved.
+        try:
+            parsed = self._parse_path(filepath)
+            if parsed is None: return False, "Could not find 'Name' column.", None
+            week_columns, members = parsed
+        except Exception as e:
+            return False, str(e), None
+        return (True, "Reloaded", self.apply_parsed(week_columns, members))
+
+    def adopt(self, week_columns, members):
+        # Take over an already parsed member pool; the dict is copied so
+        # engines sharing a pool can each diff against their own view
+        self.week_columns = list(week_columns)
+        self.all_members = members.copy() if isinstance(members, MemberTable) else MemberTable(members, len(week_columns))
+        self._build_availability()
+
+    def apply_parsed(self, week_columns, members):
+        if week_columns != self.week_columns:
+            self.adopt(week_columns, members)
+            return {"reshaped": True, "added": [], "removed": [], "changed": []}
+
+        old = self.all_members
+        added = [n for n in members if n not in old]
+        removed = [n for n in old if n not in members]
+        changed = [n for n in members if n in old and old.differs(n, members[n])]
+
+        for n in removed + changed: self._unindex_member(n, old[n])
+        for n in removed: del self.all_members[n]
+        for n in added + changed:
+            self.all_members[n] = members[n]
+            self._index_member(n, members[n])
+        return {"reshaped": False, "added": added, "removed": removed, "changed": changed}
+
+    def _parse_path(self, filepath):
+        # A cache hit skips Excel parsing entirely; the sheet frames are only
+        # needed while parsing and are not kept on the engine
+        start = time.perf_counter()
+        with open(filepath, "rb") as f: data = f.read()
+        key = cache_key(data, PARSER_VERSION, config_digest(INSTRUMENT_MAP))
+        parsed = self.cache.get(key)
+        cached = parsed is not None
+        if not cached:
+            frames = self._read_sheets(data)
+            if not frames: return None
+            parsed = self._parse_members(frames)
+            self.cache.put(key, *parsed)
+        self.last_load = {"cached": cached, "ms": (time.perf_counter() - start) * 1000}
+        return parsed
+
+    def _read_sheets(self, data):
+        # Every sheet with a "Name" header row, read in parallel only for
+        # large multi-sheet workbooks
+        with pd.ExcelFile(io.BytesIO(data)) as xl: sheets = xl.sheet_names
+        workers = min(len(sheets), os.cpu_count() or 1)
+        if workers < 2 or len(data) < PARALLEL_READ_BYTES:
+            return [df for df in (_read_sheet(s, data) for s in sheets) if df is not None]
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=_init_sheet_reader, initargs=(data,)) as pool:
+            return [df for df in pool.map(_read_sheet, sheets) if df is not None]
+
+    def _detect_layout(self, df):
+        # Sheets made from the same template share a header row, so the
+        # mapping found the first time is reused without looking again
+        cols = list(df.columns)
+        sig = layout_signature(cols, PARSER_VERSION, config_digest(INSTRUMENT_MAP))
+        layout = self.cache.layouts.get(sig)
+        if layout is not None: return layout
+
         inst_col = next((c for c in cols if "INSTRUMENT" in str(c).upper() or ("PIANO" in str(c).upper() and "DRUM" in str(c).upper())), None)
         filled_col = next((c for c in cols if "FILLED" in str(c).upper() or "✅" in str(c)), None)
         
@@ -41,8 +171,8 @@ class RosterEngine:
         
         def check_col(name, keys):
             if any(k in str(name).upper() for k in keys): return True
-            if not self.df.empty:
-                val = str(self.df[name].iloc[0]).upper()
+            if not df.empty:
+                val = str(df[name].iloc[0]).upper()
                 if any(k in val for k in keys): return True
             return False
 
@@ -53,12 +183,38 @@ class RosterEngine:
             elif check_col(c, ["FMC", "MC"]): fmc_col = c
             elif check_col(c,["FUT", "USHER"]): fut_col = c
 
-        self.week_columns =[c for c in cols if "Week" in c]
-        self.availability_map = {week: {role:[] for role in ROLES_ORDER} for week in self.week_columns}
+        layout = {"inst": inst_col, "filled": filled_col, "fwt": fwt_col, "fph": fph_col,
+                  "fmc": fmc_col, "fut": fut_col, "weeks": [c for c in cols if "Week" in c]}
+        self.cache.layouts.put(sig, layout)
+        return layout
 
-        for week in self.week_columns:
-            self.availability_map[week]["Cleanup 1"] = CLEANUP_OPTIONS.copy()
-            self.availability_map[week]["Cleanup 2"] = CLEANUP_OPTIONS.copy()
+    def _parse_members(self, frames):
+        # Members are merged by name across sheets: roles are combined, and a
+        # week is available only if every sheet listing it says so. Weeks a
+        # sheet does not cover count as unavailable for people not on a sheet
+        # that does.
+        row_cache = {}
+        sheets = [self._sheet_members(df, row_cache) for df in frames]
+        self._row_cache = row_cache
+        if len(sheets) == 1: return sheets[0]
+
+        week_columns = []
+        for weeks, _ in sheets: week_columns += [w for w in weeks if w not in week_columns]
+        merged = {}
+        for weeks, members in sheets:
+            for name, d in members.items():
+                m = merged.setdefault(name, {"Roles": [], "weeks": {}})
+                m["Roles"] += [r for r in d["Roles"] if r not in m["Roles"]]
+                for w, c in zip(weeks, d["AvailString"]):
+                    m["weeks"][w] = "X" if c == "X" or m["weeks"].get(w) == "X" else "O"
+        return week_columns, {n: {"Roles": m["Roles"], "AvailString": "".join(m["weeks"].get(w, "X") for w in week_columns)}
+                              for n, m in merged.items()}
+
+    def _sheet_members(self, df, row_cache):
+        layout = self._detect_layout(df)
+        inst_col, filled_col = layout["inst"], layout["filled"]
+        fph_col, fmc_col, fut_col = layout["fph"], layout["fmc"], layout["fut"]
+        week_columns = list(layout["weeks"])
 
         def is_active(val):
             s = str(val).upper()
@@ -83,13 +239,22 @@ class RosterEngine:
                 if "Usher" not in caps: caps.append("Usher")
             return caps
 
-        self.all_members = {}
+        # Rows are keyed by their raw cell values, so a reload only re-derives
+        # capabilities and availability for rows that actually changed
+        members = {}
 
-        for idx, row in self.df.iterrows():
+        for row in df.to_dict("records"):
             if filled_col:
                 val = str(row[filled_col]).upper()
                 if not ("✅" in val or "TRUE" in val or "Y" in val or "1" in val): continue 
             
+            key = (tuple(week_columns), tuple(map(str, row.values())))
+            cached = self._row_cache.get(key)
+            if cached:
+                row_cache[key] = cached
+                members[cached[0]] = dict(cached[1], Roles=list(cached[1]["Roles"]))
+                continue
+
             original_name = str(row['Name']).strip()
             raw_caps = get_capabilities(row)
             
@@ -98,40 +263,83 @@ class RosterEngine:
             display_name = original_name
             
             avail_str = ""
-            for week in self.week_columns:
+            for week in week_columns:
                 status = str(row[week]).upper()
                 if "N/A" in status or "NA" in status:
                     avail_str += "X"
                 else:
                     avail_str += "O"
             
-            self.all_members[display_name] = {"Roles": clean_caps, "AvailString": avail_str}
+            members[display_name] = {"Roles": clean_caps, "AvailString": avail_str}
+            row_cache[key] = (display_name, {"Roles": list(clean_caps), "AvailString": avail_str})
+
+        return week_columns, members
+
+    def _build_availability(self):
+        self.availability_map = {week: {role:[] for role in self.roles_order} for week in self.week_columns}
+
+        for week in self.week_columns:
+            for role in self.roles_order:
+                if "Cleanup" in role: self.availability_map[week][role] = self.cleanup_options.copy()
 
+        t = self.all_members
+        slot_roles = [r for r in self.roles_order if r != "MD" and "Cleanup" not in r]
+        for name, i in t.iter_ids():
+            roles = [r for r in slot_roles if t.can(i, r)]
+            if not roles: continue
+            bits = t.avail[i * t.stride:(i + 1) * t.stride]
             for w_idx, week in enumerate(self.week_columns):
-                if avail_str[w_idx] == "O":
-                    for r in ROLES_ORDER:
-                        if r == "MD": continue
-                        if "Usher" in r:
-                            if "Usher" in clean_caps: self.availability_map[week][r].append(display_name)
-                        elif "Vocal" in r:
-                            if "Vocal" in clean_caps: self.availability_map[week][r].append(display_name)
-                        elif r in clean_caps:
-                            self.availability_map[week][r].append(display_name)
-
-    def generate_draft(self):
+                if not bits[w_idx >> 3] >> (w_idx & 7) & 1: continue
+                wk = self.availability_map[week]
+                for r in roles: wk[r].append(name)
+
+    def _member_roles(self, caps):
+        roles = []
+        for r in self.roles_order:
+            if r == "MD" or "Cleanup" in r: continue
+            if "Usher" in r:
+                if "Usher" in caps: roles.append(r)
+            elif "Vocal" in r:
+                if "Vocal" in caps: roles.append(r)
+            elif r in caps:
+                roles.append(r)
+        return roles
+
+    def _member_slots(self, d):
+        roles = self._member_roles(d["Roles"])
+        if not roles: return
+        for w_idx, week in enumerate(self.week_columns):
+            if d["AvailString"][w_idx] != "O": continue
+            for r in roles: yield week, r
+
+    def _index_member(self, name, d):
+        for week, r in self._member_slots(d):
+            self.availability_map[week][r].append(name)
+
+    def _unindex_member(self, name, d):
+        for week, r in self._member_slots(d):
+            if name in self.availability_map[week][r]: self.availability_map[week][r].remove(name)
+
+    def generate_draft(self, blocked=None):
+        # blocked: {week: names already serving elsewhere that day}
+        blocked = blocked or {}
         self.initial_roster = {week: {} for week in self.week_columns}
         burnout = {name: 0 for name in self.all_members.keys()}
         last_week_played = {name: -1 for name in self.all_members.keys()}
+        counts = self.rules.tally()
         
         for w_idx, week in enumerate(self.week_columns):
-            assigned_this_week = set() 
-            sorted_roles = sorted(ROLES_ORDER, key=lambda r: len(self.availability_map[week][r]))
+            assigned_this_week = set(blocked.get(week, ())) 
+            row = self.initial_roster[week]
+            sorted_roles = sorted(self.roles_order, key=lambda r: len(self.availability_map[week][r]))
             
             # 1. Assign Standard Roles
             for role in sorted_roles:
-                if role == "MD": continue 
+                if role == "MD" or role in self.rules.tags: continue 
 
-                candidates = [p for p in self.availability_map[week][role] if p not in assigned_this_week]
+                barred = assigned_this_week | self.rules.blocked(role, row.values(), counts)
+                candidates = [p for p in self.availability_map[week][role]
+                              if p not in barred and self.rules.admits(role, p, row, self.all_members)]
                 
                 if candidates:
                     random.shuffle(candidates)
@@ -146,21 +354,209 @@ class RosterEngine:
                         assigned_this_week.add(winner)
                         burnout[winner] = burnout.get(winner, 0) + 1
                         last_week_played[winner] = w_idx
+                    self.rules.count(counts, role, winner, 1)
                 else:
                     self.initial_roster[week][role] = ""
 
-            # 2. Logic: Lock Bass if No Keys
-            if not self.initial_roster[week].get("Piano"):
-                if self.initial_roster[week].get("Bass"):
-                    bassist = self.initial_roster[week]["Bass"]
-                    self.initial_roster[week]["Bass"] = ""
-                    if bassist in burnout: burnout[bassist] -= 1
-
-            # 3. Logic: Auto-Fill MD
-            md_candidate = ""
-            for role in BAND_ROLES:
-                person = self.initial_roster[week].get(role, "")
-                if person and "MD" in self.all_members.get(person, {}).get("Roles",[]):
-                    md_candidate = person
-                    break
-            self.initial_roster[week]["MD"] = md_candidate
\ No newline at end of file
+            # 2. Logic: Empty locked roles (e.g. Bass without Piano)
+            for role, person in self.rules.clear_locked(row):
+                if person in burnout and "Cleanup" not in role: burnout[person] -= 1
+                self.rules.count(counts, role, person, -1)
+
+            # 3. Logic: Auto-Fill tag roles (MD) from the band
+            self.rules.fill_tags(row, self.all_members)
+
+    def resolve_clashes(self, blocked):
+        # Swap out anyone also serving in another service that day, refilling
+        # from free candidates with the lowest load this roster. Cleanup slots
+        # go to groups, not people, so they never clash across services.
+        load = {}
+        for roster in self.initial_roster.values():
+            for r, p in roster.items():
+                if p and r != "MD" and "Cleanup" not in r: load[p] = load.get(p, 0) + 1
+        counts = self.rules.tally(self.initial_roster, self.week_columns)
+
+        for week in self.week_columns:
+            busy = blocked.get(week, set())
+            row = self.initial_roster[week]
+            for role in self.roles_order:
+                if role == "MD" or "Cleanup" in role or row.get(role, "") not in busy: continue
+                load[row[role]] -= 1
+                used = {p for r, p in row.items() if p and r != "MD"} | busy
+                used |= self.rules.blocked(role, row.values(), counts)
+                free = [p for p in self.availability_map[week][role] if p not in used and self.rules.admits(role, p, row, self.all_members)]
+                self.rules.count(counts, role, row[role], -1)
+                row[role] = min(free, key=lambda p: (load.get(p, 0), p)) if free else ""
+                if row[role]: load[row[role]] = load.get(row[role], 0) + 1; self.rules.count(counts, role, row[role], 1)
+            self.rules.clear_locked(row)
+            self.rules.fill_tags(row, self.all_members, keep=True)
+
+    def occupancy(self, roster=None):
+        # Who holds what, in one pass over the roster: (week -> {name: role},
+        # member loads, cleanup loads, member active roles, cleanup active
+        # roles). MD doesn't count towards the serving load; names never
+        # assigned are left out.
+        roster = self.initial_roster if roster is None else roster
+        assigned, counts, cl_counts, active, cl_active = {}, {}, {}, {}, {}
+        for w in self.week_columns:
+            held = assigned[w] = {}
+            for r, val in roster.get(w, {}).items():
+                val = val.replace(" (MD)", "").strip() if val else ""
+                if not val: continue
+                held[val] = r
+                if "Cleanup" in r:
+                    if val in self.cleanup_options:
+                        cl_counts[val] = cl_counts.get(val, 0) + 1; cl_active.setdefault(val, set()).add(r)
+                elif r != "MD" and val in self.all_members:
+                    counts[val] = counts.get(val, 0) + 1; active.setdefault(val, set()).add(r)
+        return assigned, counts, cl_counts, active, cl_active
+
+    def export_rows(self, roster=None):
+        # One row per week for the Excel export: the MD column is dropped in
+        # favour of the "(MD)" tag on the band member, and Band Mode derived
+        roster = self.initial_roster if roster is None else roster
+        data =[]
+        for w in self.week_columns:
+            row = roster.get(w, {})
+            md = row.get("MD", "").replace(" (MD)", "").strip()
+            r = {}
+            for role in self.roles_order: 
+                if role == "MD": continue
+                val = row.get(role, "").replace(" (MD)", "").strip()
+                r[role] = val + " (MD)" if val and val == md else val
+            
+            # Band Mode
+            hd = r.get("Drum/Cajon", "") != ""; hk = r.get("Piano", "") != ""; hb = r.get("Bass", "") != ""
+            mode = "INCOMPLETE"
+            if hb: mode = "FULL BAND"
+            elif hd and hk: mode = "ACOUSTIC SET"
+            
+            fr = {"Week": w, "Band Mode": mode}
+            fr.update(r)
+            data.append(fr)
+        return data
+
+def parse_state(data, services=SERVICES):
+    # Check a saved-state payload and split it into (service, week_columns,
+    # members, {service: roster}). The open service's "week::role"
+    # selections take precedence over its copy under "services".
+    version = data.get("version", 1)
+    if not isinstance(version, int) or version > STATE_VERSION:
+        raise ValueError(f"Unsupported state version: {version}")
+    week_columns, members = data.get("week_columns"), data.get("all_members")
+    if not isinstance(week_columns, list) or not isinstance(members, dict):
+        raise ValueError("State is missing 'week_columns' or 'all_members'")
+    for name, d in members.items():
+        if not (isinstance(d, dict) and isinstance(d.get("Roles"), list) and isinstance(d.get("AvailString"), str)
+                and len(d["AvailString"]) == len(week_columns)):
+            raise ValueError(f"Malformed member entry: {name}")
+
+    def rows(selections):
+        out = {w: {} for w in week_columns}
+        for k, v in selections.items():
+            if "::" not in k: continue
+            w, r = k.split("::", 1)
+            out.setdefault(w, {})[r] = v
+        return out
+
+    service = data.get("service", DEFAULT_SERVICE)
+    if service not in services: service = DEFAULT_SERVICE
+    saved = data.get("services", {})
+    rosters = {svc: rows(saved.get(svc, {})) for svc in services}
+    for w, row in rows(data.get("selections", {})).items():
+        rosters[service].setdefault(w, {}).update(row)
+    return service, week_columns, members, rosters
+
+def _draft_service(service, week_columns, all_members, availability_map):
+    # Runs in a worker process; reseed so forked workers do not share shuffles
+    random.seed()
+    eng = RosterEngine(service)
+    eng.week_columns, eng.all_members, eng.availability_map = week_columns, all_members, availability_map
+    eng.generate_draft()
+    return eng.initial_roster
+
+class ServicePool:
+    # Several services (each its own roles and roster) over one parsed member
+    # pool. Services sharing a "day" may not use the same person in a week.
+    def __init__(self):
+        self.cache = ParseCache()
+        self.engines = {name: RosterEngine(name, self.cache) for name in SERVICES}
+        self.primary = self.engines[DEFAULT_SERVICE]
+
+    @property
+    def last_load(self): return self.primary.last_load
+
+    @property
+    def week_columns(self): return self.primary.week_columns
+
+    def load_file(self, filepath):
+        try:
+            parsed = self.primary._parse_path(filepath)
+            if parsed is None: return False, "Could not find 'Name' column."
+        except Exception as e:
+            return False, str(e)
+        for eng in self.engines.values(): eng.adopt(*parsed)
+        return True, "File Loaded Successfully"
+
+    def reload_file(self, filepath):
+        try:
+            parsed = self.primary._parse_path(filepath)
+            if parsed is None: return False, "Could not find 'Name' column.", None
+        except Exception as e:
+            return False, str(e), None
+        deltas = [eng.apply_parsed(*parsed) for eng in self.engines.values()]
+        return True, "Reloaded", deltas[0]
+
+    def adopt(self, week_columns, members):
+        for eng in self.engines.values(): eng.adopt(week_columns, members)
+
+    def restore(self, week_columns, members, rosters):
+        # Saved states of the same workbook share its member pool, so the
+        # current tables and availability indexes are kept when nothing
+        # differs. Otherwise the pool is packed once and every engine
+        # re-indexes from it. Returns True when the indexes were rebuilt.
+        same = (list(week_columns) == self.primary.week_columns and len(members) == len(self.primary.all_members)
+                and not any(self.primary.all_members.differs(n, d) for n, d in members.items()))
+        if not same:
+            table = MemberTable(members, len(week_columns))
+            for eng in self.engines.values(): eng.adopt(week_columns, table)
+        for svc, eng in self.engines.items():
+            roster = rosters.get(svc, {})
+            eng.initial_roster = {w: dict(roster.get(w, {})) for w in eng.week_columns}
+        return not same
+
+    def busy_elsewhere(self, service, week):
+        day = self.engines[service].day
+        busy = set()
+        for name, eng in self.engines.items():
+            if name == service or eng.day != day: continue
+            busy.update(p for r, p in eng.initial_roster.get(week, {}).items() if p and r != "MD" and "Cleanup" not in r)
+        return busy
+
+    def draft_jobs(self):
+        # Picklable arguments for _draft_service, one tuple per service
+        return [(e.service, e.week_columns, e.all_members, e.availability_map) for e in self.engines.values()]
+
+    def generate_drafts(self, executor=None):
+        engines = list(self.engines.values())
+        if len(engines) == 1 and executor is None:
+            engines[0].generate_draft()
+            return
+        # Draft every service independently across cores, then settle
+        # same-day clashes in service order
+        if executor is not None:
+            self.settle_drafts(list(executor.map(_draft_service, *zip(*self.draft_jobs()))))
+            return
+        with ProcessPoolExecutor(max_workers=min(len(engines), os.cpu_count() or 1),
+                                 mp_context=multiprocessing.get_context("spawn")) as pool:
+            self.settle_drafts(list(pool.map(_draft_service, *zip(*self.draft_jobs()))))
+
+    def settle_drafts(self, rosters):
+        engines = list(self.engines.values())
+        for eng, roster in zip(engines, rosters): eng.initial_roster = roster
+        taken = {}
+        for eng in engines:
+            blocked = {w: taken.get((eng.day, w), set()) for w in eng.week_columns}
+            eng.resolve_clashes(blocked)
+            for w in eng.week_columns:
+                taken.setdefault((eng.day, w), set()).update(p for r, p in eng.initial_roster[w].items() if p and r != "MD" and "Cleanup" not in r)
\ No newline at end of file
@@ -15,6 +15,10 @@ def exception_hook(exctype, value, tb):
         sys.__excepthook__(exctype, value, tb)
 
 if __name__ == "__main__":
+    if "--serve" in sys.argv:
+        # Headless local HTTP service instead of the desktop app
+        from server import main as serve
+        sys.exit(serve([a for a in sys.argv[1:] if a != "--serve"]))
     sys.excepthook = exception_hook
     app = QApplication(sys.argv)
     window = RosterApp()
@@ -0,0 +1,123 @@
+# members.py
+from array import array
+from collections.abc import MutableMapping
+
+# Compact member table. Members live in parallel arrays indexed by member id:
+# capabilities are a bitmask over the table's own role vocabulary and
+# availability is one packed bit row per member (bit set = available that
+# week). Lookups like "is MD-capable" or "free in week w" are single bit tests.
+#
+# The table still behaves like the old {name: {"Roles": [...], "AvailString":
+# "OOX..."}} dict, decoding entries on access, so saved states and older
+# callers keep working.
+
+class MemberTable(MutableMapping):
+    __slots__ = ("ids", "names", "roles", "avail", "n_weeks", "stride", "vocab", "bits", "_free")
+
+    def __init__(self, members=None, n_weeks=None):
+        if n_weeks is None:
+            first = next(iter(members.values()), None) if members else None
+            n_weeks = len(first["AvailString"]) if first else 0
+        self.n_weeks = n_weeks
+        self.stride = (n_weeks + 7) // 8
+        self.ids = {}
+        self.names = []
+        self.roles = array("Q")
+        self.avail = bytearray()
+        self.vocab = []
+        self.bits = {}
+        self._free = []
+        for name, d in (members or {}).items(): self[name] = d
+
+    # Encoding. Only storing a member assigns new bits (see __setitem__);
+    # lookups of a role nobody has get 0, so reads never grow the vocabulary.
+    def role_bit(self, cap): return self.bits.get(cap, 0)
+
+    def role_mask(self, caps):
+        mask = 0
+        for c in caps: mask |= self.role_bit(c)
+        return mask
+
+    def slot_mask(self, role):
+        # Numbered slots ("Usher 2", "Vocal 1") draw on the family capability
+        if "Usher" in role: return self.role_bit("Usher")
+        if "Vocal" in role: return self.role_bit("Vocal")
+        return self.role_bit(role)
+
+    def _pack(self, avail_str):
+        row = bytearray(self.stride)
+        for w, c in enumerate(avail_str[:self.n_weeks]):
+            if c == "O": row[w >> 3] |= 1 << (w & 7)
+        return row
+
+    # Bit tests
+    def id_of(self, name): return self.ids.get(name)
+
+    def has_role(self, name, cap):
+        i = self.ids.get(name)
+        return i is not None and bool(self.roles[i] & self.role_bit(cap))
+
+    def can(self, i, role): return bool(self.roles[i] & self.slot_mask(role))
+
+    def available(self, i, w): return bool(self.avail[i * self.stride + (w >> 3)] >> (w & 7) & 1)
+
+    def avail_string(self, i):
+        row = self.avail[i * self.stride:(i + 1) * self.stride]
+        return "".join("O" if row[w >> 3] >> (w & 7) & 1 else "X" for w in range(self.n_weeks))
+
+    def role_list(self, i):
+        mask = self.roles[i]
+        return [c for c, b in self.bits.items() if mask & b]
+
+    def differs(self, name, d):
+        i = self.ids.get(name)
+        if i is None: return True
+        if any(c not in self.bits for c in d["Roles"]): return True
+        return self.roles[i] != self.role_mask(d["Roles"]) or self.avail[i * self.stride:(i + 1) * self.stride] != self._pack(d["AvailString"])
+
+    def iter_ids(self): return iter(self.ids.items())
+
+    # Mapping compatibility
+    def __getitem__(self, name):
+        i = self.ids[name]
+        return {"Roles": self.role_list(i), "AvailString": self.avail_string(i)}
+
+    def __setitem__(self, name, d):
+        new = [c for c in dict.fromkeys(d["Roles"]) if c not in self.bits]
+        if len(self.vocab) + len(new) > 64:
+            raise ValueError(f"Too many distinct roles for {name} (64 max): {', '.join(new)}")
+        for c in new:
+            self.bits[c] = 1 << len(self.vocab); self.vocab.append(c)
+        mask, row = self.role_mask(d["Roles"]), self._pack(d["AvailString"])
+        i = self.ids.get(name)
+        if i is None:
+            if self._free:
+                i = self._free.pop()
+                self.names[i] = name
+            else:
+                i = len(self.names)
+                self.names.append(name); self.roles.append(0); self.avail.extend(bytes(self.stride))
+            self.ids[name] = i
+        self.roles[i] = mask
+        self.avail[i * self.stride:(i + 1) * self.stride] = row
+
+    def __delitem__(self, name):
+        i = self.ids.pop(name)
+        self.names[i] = None; self.roles[i] = 0
+        self.avail[i * self.stride:(i + 1) * self.stride] = bytes(self.stride)
+        self._free.append(i)
+
+    def __iter__(self): return iter(self.ids)
+
+    def __len__(self): return len(self.ids)
+
+    def __contains__(self, name): return name in self.ids
+
+    def copy(self):
+        t = MemberTable(n_weeks=self.n_weeks)
+        t.ids, t.names, t.roles, t.avail = dict(self.ids), list(self.names), array("Q", self.roles), bytearray(self.avail)
+        t.vocab, t.bits, t._free = list(self.vocab), dict(self.bits), list(self._free)
+        return t
+
+    def to_dict(self):
+        return {name: self[name] for name in self.ids}
@@ -0,0 +1,158 @@
+# parse_cache.py
+import os
+import json
+import mmap
+import struct
+import hashlib
+import tempfile
+
+# On-disk cache of parsed workbooks, keyed by the workbook's content hash, the
+# parser version and a digest of the config the parse reads (config_digest). Entries are small binary files that are read back via
+# mmap:
+#
+#   magic "RSTC" | u16 format | u32 header length | header JSON
+#   | role indices (u8 count + u8 index per role, per member)
+#   | availability bits (ceil(weeks / 8) bytes per member, bit set = available)
+#
+# Eviction is least-recently-used by file mtime (hits touch the entry) and
+# keeps the directory under max_bytes.
+#
+# The same directory holds layouts.json: the column mapping detected for each
+# sign-up sheet template, keyed by a hash of its header row, so a new
+# workbook built from a known template skips column detection.
+
+MAGIC = b"RSTC"
+FORMAT = 1
+_HEAD = struct.Struct("<4sHI")
+_BYTE_TO_AVAIL = ["".join("O" if b >> k & 1 else "X" for k in range(8)) for b in range(256)]
+
+def default_cache_dir():
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.environ.get("AUTO_ROSTER_CACHE", os.path.join(base, "auto-roster", "parse"))
+
+def config_digest(*parts):
+    # Stable hash of JSON-able config (e.g. INSTRUMENT_MAP); editing it must
+    # miss the cache just as a parser change does
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()[:16]
+
+def cache_key(data, parser_version, config=""):
+    h = hashlib.sha256(data)
+    h.update(f"|parser={parser_version}|config={config}".encode())
+    return h.hexdigest()
+
+def _encode(week_columns, members):
+    names = list(members)
+    vocab = []
+    for d in members.values():
+        for r in d["Roles"]:
+            if r not in vocab: vocab.append(r)
+    header = json.dumps({"weeks": week_columns, "names": names, "roles": vocab}, ensure_ascii=False).encode("utf-8")
+
+    caps = bytearray()
+    for d in members.values():
+        caps.append(len(d["Roles"]))
+        caps.extend(vocab.index(r) for r in d["Roles"])
+
+    stride = (len(week_columns) + 7) // 8
+    bits = bytearray(stride * len(names))
+    for i, d in enumerate(members.values()):
+        for w, c in enumerate(d["AvailString"]):
+            if c == "O": bits[i * stride + w // 8] |= 1 << (w % 8)
+    return _HEAD.pack(MAGIC, FORMAT, len(header)) + header + bytes(caps) + bytes(bits)
+
+def _decode(buf):
+    magic, fmt, hlen = _HEAD.unpack_from(buf, 0)
+    if magic != MAGIC or fmt != FORMAT: raise ValueError("Unknown cache entry format")
+    pos = _HEAD.size
+    header = json.loads(bytes(buf[pos:pos + hlen]).decode("utf-8")); pos += hlen
+    weeks, names, vocab = header["weeks"], header["names"], header["roles"]
+
+    roles = []
+    for _ in names:
+        n = buf[pos]
+        roles.append([vocab[j] for j in buf[pos + 1:pos + 1 + n]]); pos += 1 + n
+
+    stride = (len(weeks) + 7) // 8
+    members = {}
+    for i, name in enumerate(names):
+        row = buf[pos + i * stride:pos + (i + 1) * stride]
+        avail = "".join(_BYTE_TO_AVAIL[b] for b in row)[:len(weeks)]
+        members[name] = {"Roles": roles[i], "AvailString": avail}
+    return weeks, members
+
+def layout_signature(columns, parser_version, config=""):
+    h = hashlib.sha256("\x1f".join(map(str, columns)).encode("utf-8"))
+    h.update(f"|parser={parser_version}|config={config}".encode())
+    return h.hexdigest()
+
+class LayoutProfiles:
+    def __init__(self, directory):
+        self.path = os.path.join(directory, "layouts.json")
+        self._profiles = None
+
+    def _load(self):
+        if self._profiles is None:
+            try:
+                with open(self.path, encoding="utf-8") as f: self._profiles = json.load(f)
+            except (OSError, ValueError):
+                self._profiles = {}
+        return self._profiles
+
+    def get(self, sig):
+        return self._load().get(sig)
+
+    def put(self, sig, layout):
+        profiles = self._load()
+        profiles[sig] = layout
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f: json.dump(profiles, f, ensure_ascii=False)
+            os.replace(tmp, self.path)
+        except OSError:
+            pass
+
+class ParseCache:
+    def __init__(self, directory=None, max_bytes=64 * 1024 * 1024):
+        self.directory = directory or default_cache_dir()
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.layouts = LayoutProfiles(self.directory)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".rstc")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                result = _decode(buf)
+            os.utime(path)
+        except (OSError, ValueError, KeyError, IndexError, struct.error):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return result
+
+    def put(self, key, week_columns, members):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f: f.write(_encode(week_columns, members))
+            os.replace(tmp, self._path(key))
+            self._evict()
+        except OSError:
+            pass
+
+    def _evict(self):
+        entries = []
+        for n in os.listdir(self.directory):
+            if not n.endswith(".rstc"): continue
+            st = os.stat(os.path.join(self.directory, n))
+            entries.append((st.st_mtime, st.st_size, n))
+        total = sum(e[1] for e in entries)
+        for _, size, n in sorted(entries):
+            if total <= self.max_bytes: break
+            os.remove(os.path.join(self.directory, n))
+            total -= size
@@ -0,0 +1,157 @@
+# personal.py
+import os
+import io
+import html
+import zipfile
+import tempfile
+import datetime
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from config import *
+
+try:
+    from PIL import Image, ImageDraw, ImageFont
+    HAS_PIL = True
+except ImportError:
+    HAS_PIL = False
+
+# Per-member schedule export: one ICS calendar plus an HTML and PNG card for
+# every member who serves, all streamed into one zip. Cards are rendered in a
+# process pool; fonts, colours and the HTML template are set up once per
+# worker, and each task carries only a batch of members' serving lists.
+
+BATCH = 24
+
+_HTML = """<!doctype html>
+<html><head><meta charset="utf-8"><title>{name}</title>
+<style>
+body {{ font-family: "Segoe UI", Arial, sans-serif; margin: 16px; }}
+h1 {{ font-size: 18px; margin: 0 0 8px; }}
+table {{ border-collapse: collapse; }}
+td {{ border: 1px solid #ccc; padding: 4px 10px; font-size: 13px; }}
+.md {{ font-weight: bold; }}
+</style></head>
+<body><h1>{name}</h1><table>
+{rows}
+</table></body></html>
+"""
+_HTML_ROW = '<tr><td>{week}</td><td>{date}</td><td style="color: {color}"{cls}>{role}</td></tr>'
+
+_worker = {}
+
+def member_schedules(snap):
+    # {name: [(week_idx, week, role, is_md)]} for every member who serves
+    out = {}
+    for w_idx, week in enumerate(snap.week_columns):
+        row = snap.roster.get(week, {})
+        md = row.get("MD", "").replace(" (MD)", "").strip()
+        for role in snap.roles_order:
+            if role == "MD": continue
+            name = row.get(role, "").replace(" (MD)", "").strip()
+            if not name or name not in snap.members: continue
+            out.setdefault(name, []).append((w_idx, week, role, name == md))
+    return out
+
+def _role_colors(snap):
+    cats = THEMES["Light"]["cats"]
+    return {r: cats.get(cat, "#000000") for cat, data in snap.category_config.items() for r in data["roles"]}
+
+def _init_worker(dates, colors, formats):
+    _worker["dates"] = dates
+    _worker["colors"] = colors
+    _worker["formats"] = formats
+    if HAS_PIL and "png" in formats:
+        try:
+            _worker["font"] = ImageFont.truetype("arial.ttf", 12)
+            _worker["fontb"] = ImageFont.truetype("arialbd.ttf", 14)
+        except OSError:
+            _worker["font"] = _worker["fontb"] = ImageFont.load_default()
+
+def _slug(name):
+    keep = "".join(c if c.isalnum() or c in "-_" else "_" for c in name).strip("_")
+    return keep or "member"
+
+def _ics_escape(s):
+    return s.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+def _ics(name, entries, dates):
+    stamp = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    lines = ["BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//Auto-Roster//Personal Schedule//EN", "CALSCALE:GREGORIAN"]
+    for w_idx, week, role, is_md in entries:
+        day = dates[w_idx]
+        summary = f"{role} (MD)" if is_md else role
+        lines += [
+            "BEGIN:VEVENT",
+            f"UID:{_slug(name)}-{w_idx}-{_slug(role)}@auto-roster",
+            f"DTSTAMP:{stamp}",
+            f"DTSTART;VALUE=DATE:{day.strftime('%Y%m%d')}",
+            f"DTEND;VALUE=DATE:{(day + datetime.timedelta(days=1)).strftime('%Y%m%d')}",
+            f"SUMMARY:{_ics_escape(summary)}",
+            f"DESCRIPTION:{_ics_escape(f'{week}: {name} serving as {summary}')}",
+            "END:VEVENT",
+        ]
+    lines.append("END:VCALENDAR")
+    return ("\r\n".join(lines) + "\r\n").encode("utf-8")
+
+def _html(name, entries, dates, colors):
+    rows = "\n".join(_HTML_ROW.format(
+        week=html.escape(week), date=dates[w_idx].strftime("%d %b %Y"), color=colors.get(role, "#000000"),
+        cls=' class="md"' if is_md else "", role=html.escape(f"{role} (MD)" if is_md else role))
+        for w_idx, week, role, is_md in entries)
+    return _HTML.format(name=html.escape(name), rows=rows).encode("utf-8")
+
+def _png(name, entries, dates, colors):
+    ROW_H = 24; W = 360; PAD = 12
+    img = Image.new("RGB", (W, PAD * 2 + 28 + ROW_H * len(entries)), "white")
+    draw = ImageDraw.Draw(img)
+    draw.text((PAD, PAD), name, fill="black", font=_worker["fontb"])
+    y = PAD + 28
+    for w_idx, week, role, is_md in entries:
+        draw.rectangle([PAD, y, W - PAD, y + ROW_H], outline="#cccccc")
+        draw.text((PAD + 6, y + 5), f"{week}  {dates[w_idx].strftime('%d %b')}", fill="black", font=_worker["font"])
+        draw.text((W // 2 + 10, y + 5), f"{role} (MD)" if is_md else role, fill=colors.get(role, "black"), font=_worker["font"])
+        y += ROW_H
+    buf = io.BytesIO()
+    img.save(buf, format="PNG")
+    return buf.getvalue()
+
+def _render_batch(batch):
+    dates, colors, formats = _worker["dates"], _worker["colors"], _worker["formats"]
+    out = []
+    for name, slug, entries in batch:
+        if "ics" in formats: out.append((f"ics/{slug}.ics", _ics(name, entries, dates)))
+        if "html" in formats: out.append((f"html/{slug}.html", _html(name, entries, dates, colors)))
+        if "png" in formats and HAS_PIL: out.append((f"png/{slug}.png", _png(name, entries, dates, colors)))
+    return out
+
+def export_personal(snap, out_path, first_date, formats=("ics", "html", "png"), workers=None):
+    # first_date is the date of the first week column; weeks are 7 days apart
+    dates = [first_date + datetime.timedelta(weeks=i) for i in range(len(snap.week_columns))]
+    schedules, seen = [], set()
+    for name, entries in sorted(member_schedules(snap).items()):
+        # Distinct names can share a slug ("Bob Jr" / "Bob, Jr"); keep archive paths unique
+        base = slug = _slug(name); n = 2
+        while slug.lower() in seen: slug = f"{base}_{n}"; n += 1
+        seen.add(slug.lower())
+        schedules.append((name, slug, entries))
+    batches = [schedules[i:i + BATCH] for i in range(0, len(schedules), BATCH)]
+
+    d = os.path.dirname(os.path.abspath(out_path))
+    fd, tmp = tempfile.mkstemp(dir=d, prefix=".", suffix=".part")
+    os.close(fd)
+    try:
+        with zipfile.ZipFile(tmp, "w", zipfile.ZIP_DEFLATED) as zf, \
+             ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"), initializer=_init_worker,
+                                 initargs=(dates, _role_colors(snap), tuple(formats))) as pool:
+            # Entries go into the archive batch by batch as results arrive,
+            # rather than after every card has been rendered
+            for files in pool.map(_render_batch, batches):
+                for arcname, data in files:
+                    # PNGs are already compressed
+                    zf.writestr(arcname, data, zipfile.ZIP_STORED if arcname.endswith(".png") else zipfile.ZIP_DEFLATED)
+        os.replace(tmp, out_path)
+    except BaseException:
+        if os.path.exists(tmp): os.remove(tmp)
+        raise
+    return len(schedules)
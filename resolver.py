@@ -0,0 +1,169 @@
+# resolver.py
+import time
+from config import *
+from rules import RuleSet
+
+# Suggests the smallest set of cell changes that clears the validation
+# conflicts (duplicates, people already serving another service that day and
+# broken RULES, e.g. MD not in band, Bass without Piano). Weeks are fixed one at a time with bounded swap-chain search;
+# replacements favour the people with the lowest serving load so far and
+# never break a rule themselves.
+
+MAX_CHAIN = 3        # longest move chain tried when no free person fits a slot
+BLANK_PENALTY = 2    # leaving a slot empty counts as this many extra changes
+
+def _dupes(row, roles_order):
+    seen = {}
+    for role in roles_order:
+        if role == "MD": continue
+        val = row.get(role, "")
+        if val: seen.setdefault(val, []).append(role)
+    return [("dupe", name, roles) for name, roles in seen.items() if len(roles) > 1]
+
+def _elsewhere(row, roles_order, busy):
+    held = {}
+    for role in roles_order:
+        val = row.get(role, "")
+        if val in busy and role != "MD" and "Cleanup" not in role: held.setdefault(val, []).append(role)
+    return [("elsewhere", name, roles) for name, roles in held.items()]
+
+def find_conflicts(row, all_members, roles_order=ROLES_ORDER, rules=None, counts=None, busy=()):
+    # counts (RuleSet.tally) is only needed for max_per_period rules; busy is
+    # who already serves another service that day (ServicePool.busy_elsewhere)
+    rules = rules if rules is not None else RuleSet(RULES, roles_order)
+    found = _dupes(row, roles_order) + rules.violations(row, all_members, counts)
+    return found + _elsewhere(row, roles_order, busy) if busy else found
+
+def _used(row):
+    return {v for r, v in row.items() if v and r != "MD"}
+
+def _fill(row, slot, week_avail, load, depth, banned, deadline, ctx):
+    # Put someone into `slot`, either a free person or by moving an already
+    # placed person and refilling their old slot (up to `depth` moves deep)
+    rules, members, counts, busy = ctx
+    used = _used(row)
+    barred = used | busy | rules.blocked(slot, used, counts)
+    free = [p for p in week_avail.get(slot, []) if p not in barred and rules.admits(slot, p, row, members)]
+    if free:
+        return [(slot, min(free, key=lambda p: (load.get(p, 0), p)))]
+    if depth == 0 or time.perf_counter() > deadline: return None
+
+    where = {v: r for r, v in row.items() if v and r != "MD"}
+    movers = sorted((p for p in week_avail.get(slot, []) if p in where and where[p] not in banned and p not in busy),
+                    key=lambda p: (load.get(p, 0), p))
+    for p in movers:
+        src = where[p]
+        trial = dict(row); trial[slot] = p; trial[src] = ""
+        sub = _fill(trial, src, week_avail, load, depth - 1, banned | {slot}, deadline, ctx)
+        if sub is not None: return [(slot, p)] + sub
+    return None
+
+def _best_fill(row, slot, week_avail, load, banned, deadline, ctx):
+    # Iterative deepening so the shortest chain wins
+    for depth in range(MAX_CHAIN + 1):
+        moves = _fill(row, slot, week_avail, load, depth, banned, deadline, ctx)
+        if moves is not None: return moves
+        if time.perf_counter() > deadline: break
+    return None
+
+def _apply(row, moves):
+    for slot, p in moves: row[slot] = p
+
+def _cost(orig, row):
+    changed = sum(1 for r in set(orig) | set(row) if orig.get(r, "") != row.get(r, ""))
+    blanks = sum(1 for r in orig if orig[r] and not row.get(r, ""))
+    return changed + blanks * BLANK_PENALTY
+
+def _fix_dupes(row, week_avail, load, deadline, roles_order, ctx):
+    for _ in range(len(roles_order)):
+        dupes = _dupes(row, roles_order)
+        if not dupes: return
+        _, name, roles = dupes[0]
+        best = None
+        # Try keeping the person in each of their slots, refill the others
+        for keep in roles:
+            trial = dict(row)
+            for r in roles:
+                if r != keep: trial[r] = ""
+            for r in roles:
+                if r == keep: continue
+                moves = _best_fill(trial, r, week_avail, load, {keep}, deadline, ctx)
+                if moves: _apply(trial, moves)
+            cost = _cost(row, trial)
+            if best is None or cost < best[0]: best = (cost, trial)
+        row.clear(); row.update(best[1])
+
+def _fix_requires(row, week_avail, load, deadline, ctx):
+    # A role filled without the one it needs: fill the need if that is no
+    # dearer than emptying the role
+    for role, need, _ in ctx[0].requires:
+        if not (row.get(role) and not row.get(need)): continue
+        trial = dict(row)
+        moves = _best_fill(trial, need, week_avail, load, {role}, deadline, ctx)
+        if moves:
+            _apply(trial, moves)
+            cleared = dict(row); cleared[role] = ""
+            if _cost(row, trial) <= _cost(row, cleared):
+                row.update(trial); continue
+        row[role] = ""
+
+def _fix_refill(row, week_avail, load, deadline, roles_order, ctx):
+    # Partners serving together, people over a period limit or people already
+    # serving another service that day: empty their cells and refill them
+    # with someone the rules allow
+    rules, members, counts, busy = ctx
+    full = [dict(c) for c in counts]
+    for r, v in row.items():
+        if v: rules.count(full, r, v, 1)
+    cells = [r for _, _, roles in _elsewhere(row, roles_order, busy) for r in roles]
+    for label, _, roles in rules.violations(row, members, full):
+        if rules.kind_of.get(label) in ("never_together", "max_per_period"): cells.extend(roles)
+    for r in cells:
+        if not row.get(r): continue
+        row[r] = ""
+        moves = _best_fill(row, r, week_avail, load, set(), deadline, ctx)
+        if moves: _apply(row, moves)
+
+def suggest_fixes(roster, availability_map, all_members, week_columns, budget=0.08,
+                  roles_order=ROLES_ORDER, rules=None, elsewhere=None):
+    # elsewhere: {week: names serving another service that day}; they are
+    # reported as conflicts and never suggested
+    rules = rules if rules is not None else RuleSet(RULES, roles_order)
+    elsewhere = elsewhere or {}
+    deadline = time.perf_counter() + budget
+    load = {}
+    for w in week_columns:
+        for r, v in roster.get(w, {}).items():
+            if v and r != "MD" and "Cleanup" not in r: load[v] = load.get(v, 0) + 1
+    # While a week is fixed, counts cover every other week
+    counts = rules.tally(roster, week_columns)
+
+    changes = []
+    for w in week_columns:
+        orig = roster.get(w, {})
+        busy = set(elsewhere.get(w, ()))
+        if not find_conflicts(orig, all_members, roles_order, rules, counts, busy): continue
+        ctx = (rules, all_members, counts, busy)
+        row = dict(orig)
+        week_avail = availability_map.get(w, {})
+        for r, v in orig.items():
+            if v: rules.count(counts, r, v, -1)
+        _fix_dupes(row, week_avail, load, deadline, roles_order, ctx)
+        _fix_refill(row, week_avail, load, deadline, roles_order, ctx)
+        _fix_requires(row, week_avail, load, deadline, ctx)
+        rules.clear_locked(row)
+        rules.fill_tags(row, all_members, keep=True)
+
+        for r in roles_order:
+            old, new = orig.get(r, ""), row.get(r, "")
+            if old == new: continue
+            changes.append((w, r, old, new))
+            if "Cleanup" in r or r == "MD": continue
+            if old: load[old] = load.get(old, 0) - 1
+            if new: load[new] = load.get(new, 0) + 1
+        for r, v in row.items():
+            if v: rules.count(counts, r, v, 1)
+    return changes
+
+def format_changes(changes):
+    return "\n".join(f"{w} / {r}: {old or '(empty)'} -> {new or '(empty)'}" for w, r, old, new in changes)
@@ -0,0 +1,130 @@
+# rules.py
+from config import *
+
+# Roster rules from config, compiled once per engine into lookup tables: lock
+# lists, partner sets and per-limit role sets. The draft, the validator, the
+# resolver and the dropdowns all ask the same RuleSet, so a new rule takes
+# effect everywhere and is answered with set lookups during the existing
+# passes rather than with a scan of its own.
+
+def _has(members, name, cap):
+    # MemberTable bit test, or the plain saved-state dict
+    if hasattr(members, "has_role"): return members.has_role(name, cap)
+    return cap in members.get(name, {}).get("Roles", [])
+
+class RuleSet:
+    def __init__(self, rules, roles_order):
+        present = set(roles_order)
+        self.requires = []     # (role, needs, label)
+        self.excludes = []     # (role, other, label)
+        self.must_be_in = {}   # role: (roles or None, capability or None, label)
+        self.caps = []         # (limit, frozenset of roles, label)
+        self.partners = {}     # name: {partner: label}
+        self.kind_of = {}      # label: kind
+        # Rules naming a role this service lacks are dropped, as the old
+        # hard-coded checks were skipped when there was no Piano column
+        for rule in rules:
+            kind = rule["kind"]
+            label = rule.get("name", kind)
+            self.kind_of[label] = kind
+            if kind == "requires":
+                if rule["role"] in present and rule["needs"] in present:
+                    self.requires.append((rule["role"], rule["needs"], label))
+            elif kind == "excludes":
+                if rule["role"] in present and rule["other"] in present:
+                    self.excludes.append((rule["role"], rule["other"], label))
+            elif kind == "must_be_in":
+                if rule["role"] in present:
+                    roles = [r for r in rule["roles"] if r in present] if "roles" in rule else None
+                    self.must_be_in[rule["role"]] = (roles, rule.get("capability"), label)
+            elif kind == "max_per_period":
+                roles = rule.get("roles") or [r for r in roles_order if r != "MD" and "Cleanup" not in r]
+                self.caps.append((rule["limit"], frozenset(r for r in roles if r in present), label))
+            elif kind == "never_together":
+                for a in rule["names"]:
+                    for b in rule["names"]:
+                        if a != b: self.partners.setdefault(a, {})[b] = label
+            else:
+                raise ValueError(f"Unknown rule kind: {kind}")
+        # Roles whose holder must also fill another slot that week (MD) are
+        # tags on that slot, not slots of their own
+        self.tags = {r for r, (roles, _, _) in self.must_be_in.items() if roles is not None}
+        self.lockable = {r for r, _, _ in self.requires} | {o for _, o, _ in self.excludes}
+
+    # Week-level predicates
+    def locked(self, row):
+        # Roles that must stay empty given what else is filled this week
+        out = {r for r, need, _ in self.requires if not row.get(need)}
+        out.update(o for r, o, _ in self.excludes if row.get(r))
+        return out
+
+    def holds(self, role, name, row, members):
+        roles, cap, _ = self.must_be_in.get(role, (None, None, None))
+        if roles is not None and not any(row.get(r, "") == name for r in roles): return False
+        return cap is None or _has(members, name, cap)
+
+    def admits(self, role, name, row, members):
+        return role not in self.must_be_in or self.holds(role, name, row, members)
+
+    def options(self, role, row, members):
+        # Who may hold a tag role this week, in the order of its slot list
+        roles = self.must_be_in[role][0]
+        return [row[r] for r in roles if row.get(r) and self.holds(role, row[r], row, members)]
+
+    def blocked(self, role, placed, counts=None):
+        # People barred from `role` by who is already placed this week or by
+        # a period limit they have reached
+        out = set()
+        for n in placed: out.update(self.partners.get(n, ()))
+        if counts:
+            for k, (limit, roles, _) in enumerate(self.caps):
+                if role in roles: out.update(n for n, c in counts[k].items() if c >= limit)
+        return out
+
+    # Period-level counts for max_per_period
+    def tally(self, roster=None, weeks=()):
+        counts = [{} for _ in self.caps]
+        for w in weeks:
+            for r, v in (roster or {}).get(w, {}).items():
+                if v: self.count(counts, r, v, 1)
+        return counts
+
+    def count(self, counts, role, name, delta):
+        for k, (_, roles, _) in enumerate(self.caps):
+            if role in roles: counts[k][name] = counts[k].get(name, 0) + delta
+
+    # Fix-ups shared by the draft and the clash resolver
+    def clear_locked(self, row):
+        cleared = []
+        for r in self.locked(row):
+            if row.get(r): cleared.append((r, row[r])); row[r] = ""
+        return cleared
+
+    def fill_tags(self, row, members, keep=False):
+        # keep: leave a tag alone while its holder still qualifies
+        for tag in self.tags:
+            if keep and (not row.get(tag) or self.holds(tag, row[tag], row, members)): continue
+            row[tag] = next(iter(self.options(tag, row, members)), "")
+
+    def violations(self, row, members, counts=None):
+        # [(label, name, roles)] for one week; counts enables period limits
+        issues = []
+        for r, need, label in self.requires:
+            if row.get(r) and not row.get(need): issues.append((label, row[r], [r]))
+        for r, other, label in self.excludes:
+            if row.get(r) and row.get(other): issues.append((label, row[other], [other]))
+        for r, (_, _, label) in self.must_be_in.items():
+            v = row.get(r, "")
+            if v and not self.holds(r, v, row, members): issues.append((label, v, [r]))
+        if self.partners or (counts and self.caps):
+            held = {}
+            for r, v in row.items():
+                if v and r not in self.tags: held.setdefault(v, []).append(r)
+            for a in held:
+                for b, label in self.partners.get(a, {}).items():
+                    if b in held and a < b: issues.append((label, b, held[b]))
+            for k, (limit, roles, label) in enumerate(self.caps if counts else ()):
+                for n, rs in held.items():
+                    over = [r for r in rs if r in roles]
+                    if over and counts[k].get(n, 0) > limit: issues.append((label, n, over))
+        return issues
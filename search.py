@@ -0,0 +1,111 @@
+# search.py
+from bisect import bisect_left, insort
+
+from config import LOAD_WARN
+
+# In-memory index over the dashboard member pool. Built when the member table
+# changes, with loads refreshed on each dashboard update; every keystroke in
+# the filter bar is then answered from the index (word prefixes, name
+# trigrams, role bitmasks, load buckets, availability bits) without touching
+# the widgets or rescanning the member table.
+#
+# Query syntax: whitespace-separated terms, all of which must match.
+#   ann          name contains "ann" (shorter terms match word prefixes)
+#   role:piano   can play a role whose name contains "piano"
+#   load:0       serving load 0, below LOAD_WARN or at/above it ("load:1-2", "load:3+")
+#   free:3       available in week 3 ("w3", "week3" or an exact column name);
+#                longer text matches any week column containing it ("free:jan")
+
+LOAD_BUCKETS = ("0", f"1-{LOAD_WARN - 1}", f"{LOAD_WARN}+")
+
+def load_bucket(c): return LOAD_BUCKETS[0] if c == 0 else LOAD_BUCKETS[1 if c < LOAD_WARN else 2]
+
+def _trigrams(s): return {s[i:i + 3] for i in range(len(s) - 2)}
+
+class MemberIndex:
+    __slots__ = ("table", "names", "extra", "lower", "words", "tri", "buckets", "roles_order", "week_columns", "_role_cache", "_week_cache")
+
+    def __init__(self, table, roles_order, week_columns, extra_names=()):
+        # extra_names (cleanup options) are searchable by name and load only
+        self.table = table
+        self.roles_order = list(roles_order)
+        self.week_columns = list(week_columns)
+        self.extra = set(extra_names)
+        self.names = list(table) + [n for n in extra_names if n not in table]
+        self.lower = {n: n.lower() for n in self.names}
+        self.words = sorted((w, n) for n, low in self.lower.items() for w in low.split())
+        self.tri = {}
+        for n, low in self.lower.items():
+            for g in _trigrams(low): self.tri.setdefault(g, set()).add(n)
+        self.buckets = {b: set() for b in LOAD_BUCKETS}
+        self.buckets["0"].update(self.names)
+        self._role_cache = {}
+        self._week_cache = {}
+
+    def update(self, names):
+        # Re-index just these names after the table changed in place (a watch
+        # reload); role and week answers are recomputed on the next query
+        names = set(names)
+        for n in names & self.lower.keys():
+            for g in _trigrams(self.lower.pop(n)): self.tri[g].discard(n)
+        self.words = [wn for wn in self.words if wn[1] not in names]
+        self.names = [n for n in self.names if n not in names]
+        for n in names:
+            if n not in self.table and n not in self.extra: continue
+            self.names.append(n)
+            low = self.lower[n] = n.lower()
+            for w in low.split(): insort(self.words, (w, n))
+            for g in _trigrams(low): self.tri.setdefault(g, set()).add(n)
+        self._role_cache.clear()
+        self._week_cache.clear()
+
+    def set_loads(self, counts):
+        self.buckets = {b: set() for b in LOAD_BUCKETS}
+        for n in self.names: self.buckets[load_bucket(counts.get(n, 0))].add(n)
+
+    # Term matchers
+    def _by_name(self, term):
+        if len(term) < 3:
+            out, i = set(), bisect_left(self.words, (term,))
+            while i < len(self.words) and self.words[i][0].startswith(term):
+                out.add(self.words[i][1]); i += 1
+            return out
+        grams = sorted((self.tri.get(g, set()) for g in _trigrams(term)), key=len)
+        cands = set.intersection(*grams) if grams else set()
+        # Shared trigrams don't guarantee the substring; confirm it
+        return {n for n in cands if term in self.lower[n]}
+
+    def _by_role(self, term):
+        if term not in self._role_cache:
+            roles = [r for r in self.roles_order if term in r.lower()]
+            mask = 0
+            for r in roles: mask |= self.table.slot_mask(r)
+            self._role_cache[term] = {n for n, i in self.table.iter_ids() if self.table.roles[i] & mask}
+        return self._role_cache[term]
+
+    def _by_week(self, term):
+        if term not in self._week_cache:
+            # Exact column name, then week number ("3", "w3", "week3"), and only
+            # then substring, so "3" doesn't also pick up weeks 13 and 30-39
+            weeks = [w for w, col in enumerate(self.week_columns) if term == col.lower().replace(" ", "")]
+            num = term.removeprefix("week").removeprefix("w")
+            if not weeks and num.isdigit() and 0 < int(num) <= len(self.week_columns): weeks = [int(num) - 1]
+            if not weeks and len(term) >= 3: weeks = [w for w, col in enumerate(self.week_columns) if term in col.lower()]
+            self._week_cache[term] = {n for n, i in self.table.iter_ids() if any(self.table.available(i, w) for w in weeks)}
+        return self._week_cache[term]
+
+    def query(self, text):
+        # None means "no filter"; otherwise the set of matching names
+        terms = text.lower().split()
+        if not terms: return None
+        result = None
+        for term in terms:
+            key, _, val = term.partition(":")
+            if not val: hits = self._by_name(term)
+            elif key == "role": hits = self._by_role(val)
+            elif key == "load": hits = self.buckets.get(val, set())
+            elif key in ("free", "week"): hits = self._by_week(val)
+            else: hits = self._by_name(term)
+            result = set(hits) if result is None else result & hits
+            if not result: break
+        return result
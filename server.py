@@ -0,0 +1,274 @@
+# server.py
+import os
+import sys
+import json
+import asyncio
+import argparse
+import multiprocessing
+from urllib.parse import urlsplit, parse_qs
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from config import *
+from exporters import _atomic
+from logic import ServicePool, _draft_service
+from resolver import find_conflicts, suggest_fixes
+
+# Local JSON-over-HTTP roster service for other tools (sign-up form, chat bot).
+# Parsed workbooks stay warm in memory keyed by path and reload when the file's
+# mtime changes. Identical concurrent requests share one in-flight result, and
+# drafting runs in a process pool so the event loop keeps answering.
+#
+#   GET  /health
+#   GET  /roster?path=...&service=...
+#   POST /load      {"path"}
+#   POST /draft     {"path"}                       -> drafts every service
+#   POST /validate  {"path", "service"?, "roster"?}
+#   POST /export    {"path", "service"?, "out", "roster"?}  (.xlsx or .json, under --export-dir)
+#
+# POST bodies must be sent as application/json, so a page in a browser can't
+# reach the service with a preflight-free text/plain form post.
+
+MAX_BODY = 8 * 1024 * 1024
+
+class HttpError(Exception):
+    def __init__(self, status, msg):
+        super().__init__(msg)
+        self.status = status
+
+class RosterService:
+    def __init__(self, workers=None, export_dir=None):
+        self.procs = ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1, mp_context=multiprocessing.get_context("spawn"))
+        self.export_dir = os.path.realpath(export_dir) if export_dir else None
+        self.workbooks = {}   # path -> {"mtime", "pool", "drafted"}
+        self.inflight = {}    # request key -> asyncio.Future
+        self.stats = {"requests": 0, "coalesced": 0}
+
+    async def _coalesce(self, key, factory):
+        fut = self.inflight.get(key)
+        if fut is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(fut)
+        fut = asyncio.ensure_future(factory())
+        self.inflight[key] = fut
+        fut.add_done_callback(lambda _: self.inflight.pop(key, None))
+        return await asyncio.shield(fut)
+
+    async def workbook(self, path):
+        if not path: raise HttpError(400, "Missing 'path'")
+        path = os.path.abspath(path)
+        try: mtime = os.stat(path).st_mtime_ns
+        except OSError: raise HttpError(404, f"No such workbook: {path}")
+        wb = self.workbooks.get(path)
+        if wb and wb["mtime"] == mtime: return wb
+        return await self._coalesce(("load", path, mtime), lambda: self._load(path, mtime))
+
+    async def _load(self, path, mtime):
+        # A changed file is parsed into a fresh pool and swapped in, so handlers
+        # still holding the old one never see it half-updated
+        loop = asyncio.get_running_loop()
+        pool = ServicePool()
+        ok, msg = await loop.run_in_executor(None, pool.load_file, path)
+        if not ok: raise HttpError(422, msg)
+        old = self.workbooks.get(path)
+        if old:
+            # Keep picks for weeks that still exist; /roster redrafts against the new sheet
+            for svc, eng in pool.engines.items():
+                prev = old["pool"].engines.get(svc)
+                if prev: eng.initial_roster = {w: prev.initial_roster.get(w, {}) for w in eng.week_columns}
+        wb = {"pool": pool, "drafted": False, "mtime": mtime}
+        self.workbooks[path] = wb
+        return wb
+
+    def _engine(self, wb, service):
+        service = service or DEFAULT_SERVICE
+        if service not in wb["pool"].engines: raise HttpError(404, f"Unknown service: {service}")
+        return wb["pool"].engines[service]
+
+    async def draft(self, wb):
+        loop = asyncio.get_running_loop()
+        pool = wb["pool"]
+        rosters = await asyncio.gather(*(loop.run_in_executor(self.procs, _draft_service, *job) for job in pool.draft_jobs()))
+        pool.settle_drafts(rosters)
+        wb["drafted"] = True
+        return {svc: eng.initial_roster for svc, eng in pool.engines.items()}
+
+    # Handlers
+    async def h_health(self, q, body):
+        return {"ok": True, "workbooks": len(self.workbooks), **self.stats}
+
+    async def h_load(self, q, body):
+        wb = await self.workbook(body.get("path"))
+        pool = wb["pool"]
+        return {"weeks": pool.week_columns, "members": len(pool.primary.all_members),
+                "services": list(pool.engines), "cached": pool.last_load["cached"]}
+
+    async def h_draft(self, q, body):
+        wb = await self.workbook(body.get("path"))
+        key = ("draft", id(wb), wb["mtime"])
+        return {"rosters": await self._coalesce(key, lambda: self.draft(wb))}
+
+    async def h_roster(self, q, body):
+        wb = await self.workbook(q.get("path") or body.get("path"))
+        if not wb["drafted"]:
+            await self._coalesce(("draft", id(wb), wb["mtime"]), lambda: self.draft(wb))
+        eng = self._engine(wb, q.get("service") or body.get("service"))
+        return {"service": eng.service, "weeks": eng.week_columns, "roster": eng.initial_roster}
+
+    async def h_validate(self, q, body):
+        wb = await self.workbook(body.get("path"))
+        eng = self._engine(wb, body.get("service"))
+        roster = _roster(body, eng)
+        roster = {w: {r: str(v).replace(" (MD)", "").strip() for r, v in row.items()} for w, row in roster.items()}
+        conflicts = {}
+        counts = eng.rules.tally(roster, eng.week_columns)
+        elsewhere = {w: wb["pool"].busy_elsewhere(eng.service, w) for w in eng.week_columns}
+        for w in eng.week_columns:
+            found = find_conflicts(roster.get(w, {}), eng.all_members, eng.roles_order, eng.rules, counts, elsewhere[w])
+            if found: conflicts[w] = [{"kind": k, "name": n, "roles": rs} for k, n, rs in found]
+        fixes = []
+        if conflicts:
+            # The search may use its whole time budget; keep it off the loop
+            fixes = await asyncio.get_running_loop().run_in_executor(None, lambda: suggest_fixes(
+                roster, eng.availability_map, eng.all_members, eng.week_columns,
+                roles_order=eng.roles_order, rules=eng.rules, elsewhere=elsewhere))
+        return {"valid": not conflicts, "conflicts": conflicts,
+                "suggestions": [{"week": w, "role": r, "old": o, "new": n} for w, r, o, n in fixes]}
+
+    async def h_export(self, q, body):
+        wb = await self.workbook(body.get("path"))
+        eng = self._engine(wb, body.get("service"))
+        out = self._export_path(body.get("out"))
+        rows = eng.export_rows(_roster(body, eng))
+        loop = asyncio.get_running_loop()
+        if out.lower().endswith(".json"):
+            write = lambda f: json.dump(rows, f, indent=2)
+            await loop.run_in_executor(None, _atomic, out, write, False)
+        else:
+            write = lambda f: pd.DataFrame(rows).to_excel(f, index=False, engine="openpyxl")
+            await loop.run_in_executor(None, _atomic, out, write)
+        return {"written": out, "rows": len(rows)}
+
+    def _export_path(self, out):
+        # Relative to --export-dir; anything resolving outside it is refused
+        if not self.export_dir: raise HttpError(403, "Export is disabled; start the service with --export-dir")
+        if not out: raise HttpError(400, "Missing 'out'")
+        path = os.path.realpath(os.path.join(self.export_dir, out))
+        if os.path.commonpath([path, self.export_dir]) != self.export_dir or path == self.export_dir:
+            raise HttpError(403, f"'out' must be a file inside {self.export_dir}")
+        if not os.path.isdir(os.path.dirname(path)): raise HttpError(404, f"No such folder: {os.path.dirname(path)}")
+        return path
+
+    ROUTES = {
+        ("GET", "/health"): h_health,
+        ("GET", "/roster"): h_roster,
+        ("POST", "/load"): h_load,
+        ("POST", "/draft"): h_draft,
+        ("POST", "/validate"): h_validate,
+        ("POST", "/export"): h_export,
+    }
+
+    # HTTP plumbing
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line: break
+                try:
+                    method, target, _ = line.decode("latin-1").split(" ", 2)
+                except ValueError:
+                    await self._send(writer, 400, {"error": "Bad request line"}, False)
+                    break
+
+                headers = {}
+                while True:
+                    h = await reader.readline()
+                    if h in (b"\r\n", b"\n", b""): break
+                    k, _, v = h.decode("latin-1").partition(":")
+                    headers[k.strip().lower()] = v.strip()
+                keep_alive = headers.get("connection", "").lower() != "close"
+
+                try: length = int(headers.get("content-length", "0") or 0)
+                except ValueError: length = -1
+                if length < 0:
+                    await self._send(writer, 400, {"error": "Bad Content-Length"}, False)
+                    break
+                if length > MAX_BODY:
+                    await self._send(writer, 413, {"error": "Body too large"}, False)
+                    break
+                raw = await reader.readexactly(length) if length else b""
+
+                status, payload = await self.dispatch(method.upper(), target, raw, headers)
+                await self._send(writer, status, payload, keep_alive)
+                if not keep_alive: break
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, method, target, raw, headers=None):
+        self.stats["requests"] += 1
+        url = urlsplit(target)
+        handler = self.ROUTES.get((method, url.path))
+        if handler is None: return 404, {"error": f"No route for {method} {url.path}"}
+        ctype = (headers or {}).get("content-type", "").split(";")[0].strip().lower()
+        if method == "POST" and ctype != "application/json":
+            return 415, {"error": "POST bodies must be sent as application/json"}
+        try:
+            body = json.loads(raw) if raw else {}
+            if not isinstance(body, dict): raise HttpError(400, "Body must be a JSON object")
+            q = {k: v[0] for k, v in parse_qs(url.query).items()}
+            return 200, await handler(self, q, body)
+        except json.JSONDecodeError as e:
+            return 400, {"error": f"Invalid JSON: {e}"}
+        except HttpError as e:
+            return e.status, {"error": str(e)}
+        except Exception as e:
+            return 500, {"error": f"{type(e).__name__}: {e}"}
+
+    async def _send(self, writer, status, payload, keep_alive):
+        body = json.dumps(payload).encode("utf-8")
+        reason = {200: "OK", 400: "Bad Request", 403: "Forbidden", 404: "Not Found", 413: "Payload Too Large",
+                  415: "Unsupported Media Type", 422: "Unprocessable Entity", 500: "Internal Server Error"}.get(status, "")
+        head = (f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+    def close(self):
+        self.procs.shutdown(cancel_futures=True)
+
+def _roster(body, eng):
+    # {week: {role: name}} from the request, or the service's current draft
+    roster = body.get("roster") or eng.initial_roster
+    if not isinstance(roster, dict) or not all(isinstance(row, dict) for row in roster.values()):
+        raise HttpError(400, "'roster' must be an object of {week: {role: name}}")
+    return roster
+
+async def serve(host="127.0.0.1", port=8765, workers=None, preload=(), export_dir=None):
+    service = RosterService(workers, export_dir)
+    for path in preload: await service.workbook(path)
+    server = await asyncio.start_server(service.handle, host, port)
+    print(f"Auto-Roster service on http://{host}:{port}", file=sys.stderr)
+    try:
+        async with server: await server.serve_forever()
+    finally:
+        service.close()
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Local Auto-Roster HTTP service")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--workers", type=int, default=None, help="drafting processes (default: CPU count)")
+    ap.add_argument("--preload", nargs="*", default=[], help="workbooks to parse at startup")
+    ap.add_argument("--export-dir", default=None, help="folder POST /export may write into (export is off without it)")
+    args = ap.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.preload, args.export_dir))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())